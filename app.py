@@ -1,29 +1,32 @@
 # app.py
 #!/usr/bin/env python3
-import os
 import sys
 from pathlib import Path
 
-from PyQt6.QtWidgets import QApplication
-from PyQt6.QtGui import QIcon
-
 from config import init_config
-from gui.main_window import MainWindow
+
+# Directory containing this file (the AI_HELP directory)
+APP_DIR = Path(__file__).resolve().parent
 
 def find_project_root():
     """Find the project root directory (parent of AI_HELP)."""
-    current_dir = Path(os.path.dirname(os.path.abspath(__file__)))
-    return current_dir.parent
+    return APP_DIR.parent
 
 def main():
     """Main application entry point."""
+    # Qt and the GUI modules (which pull in requests and the provider SDKs) are
+    # imported here rather than at module level so importing app.py stays cheap
+    from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtGui import QIcon
+    from gui.main_window import MainWindow
+    
     app = QApplication(sys.argv)
     app.setStyle("Fusion")
     
     # Set application icon
-    icon_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resources', 'icons', 'app_icon.png')
-    if os.path.exists(icon_path):
-        app.setWindowIcon(QIcon(icon_path))
+    icon_path = APP_DIR / 'resources' / 'icons' / 'app_icon.png'
+    if icon_path.exists():
+        app.setWindowIcon(QIcon(str(icon_path)))
     
     # Find project root (parent of the AI_HELP directory)
     project_root = find_project_root()
@@ -1,11 +1,36 @@
 # config.py
 import os
+import copy
 import json
+import stat
+import tempfile
 from pathlib import Path
 
-import os
-import json
-from pathlib import Path
+# Capability sets shared by several models; each model gets its own copy
+# so merging a user's config into one entry never affects the others
+_REASONING_CAPABILITIES = {
+    "context_window": 200000,
+    "max_tokens_default": 16000,
+    "max_completion_tokens": 100000,
+    "supports_reasoning": True
+}
+
+_GPT_CAPABILITIES = {
+    "context_window": 128000,
+    "max_tokens_default": 16384
+}
+
+def _gemini_capabilities(context_window, **extra):
+    """Build the capabilities dict for a Gemini model."""
+    capabilities = {
+        "context_window": context_window,
+        "max_tokens_default": 8192,
+        "input_token_limit": context_window,
+        "output_token_limit": 8192,
+        "supports_vision": True
+    }
+    capabilities.update(extra)
+    return capabilities
 
 # Default configuration settings
 DEFAULT_CONFIG = {
@@ -13,7 +38,7 @@ DEFAULT_CONFIG = {
         "__pycache__", ".pytest_cache", "venv", ".venv", ".env", "env",
         "virtualenv", "dist", "build", ".mypy_cache", ".coverage", ".tox",
         "node_modules", ".npm", ".yarn", ".cache", "bower_components",
-        ".next", ".nuxt", ".output", "dist", "build", "coverage",
+        ".next", ".nuxt", ".output", "coverage",
         ".git", ".hg", ".svn",
         ".vscode", ".idea", ".vs", ".cursor",
         ".DS_Store", "Thumbs.db", ".ipynb_checkpoints",
@@ -44,38 +69,22 @@ DEFAULT_CONFIG = {
                 {
                     "id": "o1",
                     "name": "OpenAI o1",
-                    "capabilities": {
-                        "context_window": 200000,
-                        "max_tokens_default": 16000,
-                        "max_completion_tokens": 100000,
-                        "supports_reasoning": True
-                    }
+                    "capabilities": dict(_REASONING_CAPABILITIES)
                 },
                 {
                     "id": "o3-mini",
                     "name": "OpenAI o3-mini",
-                    "capabilities": {
-                        "context_window": 200000,
-                        "max_tokens_default": 16000,
-                        "max_completion_tokens": 100000,
-                        "supports_reasoning": True
-                    }
+                    "capabilities": dict(_REASONING_CAPABILITIES)
                 },
                 {
                     "id": "gpt-4.5-preview",
                     "name": "GPT-4.5 Preview",
-                    "capabilities": {
-                        "context_window": 128000,
-                        "max_tokens_default": 16384
-                    }
+                    "capabilities": dict(_GPT_CAPABILITIES)
                 },
                 {
                     "id": "gpt-4o",
                     "name": "GPT-4o",
-                    "capabilities": {
-                        "context_window": 128000,
-                        "max_tokens_default": 16384
-                    }
+                    "capabilities": dict(_GPT_CAPABILITIES)
                 }
             ],
             "default_model": "gpt-4o"
@@ -86,49 +95,22 @@ DEFAULT_CONFIG = {
                 {
                     "id": "gemini-1.5-pro",
                     "name": "Gemini 1.5 Pro",
-                    "capabilities": {
-                        "context_window": 2097152,
-                        "max_tokens_default": 8192,
-                        "input_token_limit": 2097152,
-                        "output_token_limit": 8192,
-                        "supports_vision": True,
-                    }
+                    "capabilities": _gemini_capabilities(2097152)
                 },
                 {
                     "id": "gemini-2.0-pro-exp",
                     "name": "Gemini 2.0 Pro (Experimental)",
-                    "capabilities": {
-                        "context_window": 1048576,
-                        "max_tokens_default": 8192,
-                        "input_token_limit": 1048576,
-                        "output_token_limit": 8192,
-                        "supports_vision": True,
-                    }
+                    "capabilities": _gemini_capabilities(1048576)
                 },
                 {
                     "id": "gemini-2.0-flash",
                     "name": "Gemini 2.0 Flash",
-                    "capabilities": {
-                        "context_window": 1048576,
-                        "max_tokens_default": 8192,
-                        "input_token_limit": 1048576,
-                        "output_token_limit": 8192,
-                        "supports_vision": True,
-                        "supports_audio": True,
-                        "supports_video": True
-                    }
+                    "capabilities": _gemini_capabilities(1048576, supports_audio=True, supports_video=True)
                 },
                 {
                     "id": "gemini-2.0-flash-thinking-exp",
                     "name": "Gemini 2.0 Flash Thinking",
-                    "capabilities": {
-                        "context_window": 1048576,
-                        "max_tokens_default": 8192,
-                        "input_token_limit": 1048576,
-                        "output_token_limit": 8192,
-                        "supports_thinking": True,
-                        "supports_vision": True,
-                    }
+                    "capabilities": _gemini_capabilities(1048576, supports_thinking=True)
                 }
             ],
             "default_model": "gemini-2.0-flash"
@@ -161,33 +143,38 @@ DEFAULT_CONFIG = {
     }
 }
 
+def get_ai_help_dir(project_root):
+    """Get the AI_HELP directory inside the project."""
+    return Path(project_root) / "AI_HELP"
+
 def get_config_path(project_root):
     """Get the path to the config file."""
-    ai_help_dir = os.path.join(project_root, "AI_HELP")
-    return os.path.join(ai_help_dir, "config.json")
+    return get_ai_help_dir(project_root) / "config.json"
+
+def load_config_file(project_root):
+    """Load config.json from the project's AI_HELP directory."""
+    with open(get_config_path(project_root), 'r') as f:
+        return json.load(f)
 
 def init_config(project_root):
     """Initialize the configuration."""
-    config = DEFAULT_CONFIG.copy()
+    # Deep copy so merging never mutates the nested DEFAULT_CONFIG dicts
+    config = copy.deepcopy(DEFAULT_CONFIG)
     config["project_root"] = str(project_root)
     
     # Create folders if they don't exist
-    ai_help_dir = os.path.join(project_root, "AI_HELP")
-    os.makedirs(os.path.join(ai_help_dir, "prompts"), exist_ok=True)
-    os.makedirs(os.path.join(ai_help_dir, "outputs"), exist_ok=True)
-    
-    # Create resources and icons directory
-    resources_dir = os.path.join(ai_help_dir, "resources", "icons")
-    os.makedirs(resources_dir, exist_ok=True)
+    ai_help_dir = get_ai_help_dir(project_root)
+    for subdir in ("prompts", "outputs", os.path.join("resources", "icons")):
+        os.makedirs(ai_help_dir / subdir, exist_ok=True)
     
     # Try to load existing config
-    config_path = get_config_path(project_root)
     try:
-        if os.path.exists(config_path):
-            with open(config_path, 'r') as f:
-                loaded_config = json.load(f)
-                # Merge loaded config with defaults (preserving new default fields)
-                merge_configs(config, loaded_config)
+        loaded_config = load_config_file(project_root)
+        # Merge loaded config with defaults (preserving new default fields)
+        merge_configs(config, loaded_config)
+    except FileNotFoundError:
+        # First run, nothing to merge
+        pass
     except Exception:
         # If loading fails, use default config
         pass
@@ -200,15 +187,50 @@ def init_config(project_root):
 def save_config(project_root, config):
     """Save the configuration to file."""
     config_path = get_config_path(project_root)
-    os.makedirs(os.path.dirname(config_path), exist_ok=True)
+    os.makedirs(config_path.parent, exist_ok=True)
+    
+    data = json.dumps(config, indent=2)
+    
+    # Skip the write when the file already holds exactly this config
+    try:
+        with open(config_path, 'r') as f:
+            unchanged = f.read() == data
+    except OSError:
+        unchanged = False
     
-    with open(config_path, 'w') as f:
-        json.dump(config, f, indent=2)
+    if not unchanged:
+        _write_atomic(config_path, data.encode('utf-8'))
+
+def _write_atomic(path, data):
+    """Write bytes to a temp file beside path and swap it into place."""
+    # Temp files are created owner-only; give the result the mode the file
+    # already has, or the usual default for a newly created file
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+    
+    tmp = tempfile.NamedTemporaryFile('wb', dir=os.path.dirname(path), suffix='.tmp', delete=False)
+    try:
+        with tmp:
+            tmp.write(data)
+        os.chmod(tmp.name, mode)
+        os.replace(tmp.name, path)
+    except Exception:
+        os.unlink(tmp.name)
+        raise
 
 def merge_configs(default_config, loaded_config):
     """Merge loaded config with default config, preserving new default fields."""
-    for key, value in loaded_config.items():
-        if isinstance(value, dict) and key in default_config and isinstance(default_config[key], dict):
-            merge_configs(default_config[key], value)
-        else:
-            default_config[key] = value
\ No newline at end of file
+    # Walk nested dicts with an explicit stack instead of recursing per level
+    stack = [(default_config, loaded_config)]
+    while stack:
+        target, source = stack.pop()
+        for key, value in source.items():
+            existing = target.get(key)
+            if type(value) is dict and type(existing) is dict:
+                stack.append((existing, value))
+            else:
+                target[key] = value
\ No newline at end of file
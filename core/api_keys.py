@@ -1,63 +1,148 @@
 # core/api_keys.py
 import os
-import dotenv
+import re
+import stat
+import tempfile
 from pathlib import Path
 
+# Mapping of provider names to env var names
+ENV_VARS = {
+    "anthropic": "ANTHROPIC_API_KEY",
+    "openai": "OPENAI_API_KEY",
+    "gemini": "GEMINI_API_KEY"
+}
+
+# One KEY=VALUE entry per line, skipping comments and an optional "export " prefix;
+# the key must be non-blank and both parts are captured without surrounding whitespace
+_ENV_LINE_RE = re.compile(r'^(?![^\S\n]*#)[^\S\n]*(?:export [^\S\n]*)?([^=\s][^=\n]*?)[^\S\n]*=[^\S\n]*([^\n]*?)[^\S\n]*$', re.MULTILINE)
+
+# (env_path, mtime_ns, keys) from the last load_keys call
+_keys_cache = None
+
+# Environment variables set from a .env file rather than the real environment;
+# a reload may change or remove these, but never the others
+_env_file_names = set()
+
 def get_env_file_path(config):
     """Get the path to the .env file in the project directory."""
     project_root = config["project_root"]
     return os.path.join(project_root, ".env")
 
-def load_keys(config):
-    """Load API keys from .env file."""
+def parse_env_file(env_path):
+    """Parse KEY=VALUE lines from a .env file into a dictionary."""
+    with open(env_path, 'r') as f:
+        data = f.read()
+    
+    values = {}
+    for match in _ENV_LINE_RE.finditer(data):
+        key, value = match.groups()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+            value = value[1:-1]
+        values[key] = value
+    return values
+
+def _cached_keys(config):
+    """Return the shared provider -> key dict, reloading it if .env changed."""
+    global _keys_cache
     env_path = get_env_file_path(config)
     
-    if os.path.exists(env_path):
-        # Load environment variables from .env file
-        dotenv.load_dotenv(env_path)
+    try:
+        mtime = os.stat(env_path).st_mtime_ns
+    except OSError:
+        mtime = None
+    
+    # Reuse the last result while the .env file is unchanged
+    if _keys_cache is not None and _keys_cache[0] == env_path and _keys_cache[1] == mtime:
+        return _keys_cache[2]
+    
+    _apply_env_file(parse_env_file(env_path) if mtime is not None else {})
     
-    # Return dictionary of provider keys
-    return {
-        "anthropic": os.environ.get("ANTHROPIC_API_KEY", ""),
-        "openai": os.environ.get("OPENAI_API_KEY", ""),
-        "gemini": os.environ.get("GEMINI_API_KEY", "")
-    }
+    keys = {provider: os.environ.get(env_var, "") for provider, env_var in ENV_VARS.items()}
+    _keys_cache = (env_path, mtime, keys)
+    return keys
+
+def _apply_env_file(values):
+    """Apply .env values to os.environ, leaving variables set outside the file alone."""
+    # Drop values from a previous load that the file no longer has
+    for name in _env_file_names - values.keys():
+        os.environ.pop(name, None)
+        _env_file_names.discard(name)
+    
+    for name, value in values.items():
+        if not name:
+            continue  # Lines like "=value" have no variable to set
+        if name in os.environ and name not in _env_file_names:
+            continue  # Variables from the real environment take precedence
+        try:
+            os.environ[name] = value
+        except (OSError, ValueError):
+            continue  # Skip names the OS rejects
+        _env_file_names.add(name)
+
+def load_keys(config):
+    """Load API keys from .env file."""
+    # Return a copy so callers can't modify the cache
+    return dict(_cached_keys(config))
+
+def get_key(config, provider):
+    """Get the API key for a single provider, or "" if none is set."""
+    return _cached_keys(config).get(provider, "")
 
 def save_key(config, provider, api_key):
     """Save API key to .env file."""
+    global _keys_cache
     env_path = get_env_file_path(config)
     
-    # Create mapping of provider names to env var names
-    env_vars = {
-        "anthropic": "ANTHROPIC_API_KEY",
-        "openai": "OPENAI_API_KEY",
-        "gemini": "GEMINI_API_KEY"
-    }
-    
     # Get env var name for this provider
-    env_var = env_vars.get(provider)
+    env_var = ENV_VARS.get(provider)
     if not env_var:
         return False
     
-    # Load existing variables
-    env_vars_dict = {}
-    if os.path.exists(env_path):
-        with open(env_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#'):
-                    key, value = line.split('=', 1)
-                    env_vars_dict[key] = value
-    
-    # Update or add new key
-    env_vars_dict[env_var] = api_key
-    
-    # Write back to file
-    with open(env_path, 'w') as f:
-        for key, value in env_vars_dict.items():
-            f.write(f"{key}={value}\n")
-    
-    # Update environment variable in current process
+    # Stream the existing file into a temp file, replacing the key's line in place
+    prefix = f"{env_var}="
+    new_line = f"{env_var}={api_key}\n"
+    found = False
+    
+    tmp = tempfile.NamedTemporaryFile(
+        'w', dir=os.path.dirname(env_path), prefix='.env.', suffix='.tmp', delete=False
+    )
+    try:
+        with tmp:
+            last_line = "\n"
+            try:
+                with open(env_path, 'r') as f:
+                    for line in f:
+                        if line.lstrip().startswith(prefix):
+                            if found:
+                                continue  # Drop duplicate entries for this key
+                            line = new_line
+                            found = True
+                        tmp.write(line)
+                        last_line = line
+            except FileNotFoundError:
+                pass
+            
+            # Append the key if it was not already present
+            if not found:
+                if not last_line.endswith("\n"):
+                    tmp.write("\n")
+                tmp.write(new_line)
+        
+        # Keep the mode of an existing .env; a new one stays owner-only
+        try:
+            os.chmod(tmp.name, stat.S_IMODE(os.stat(env_path).st_mode))
+        except FileNotFoundError:
+            pass
+        
+        # Atomically swap the rewritten file into place
+        os.replace(tmp.name, env_path)
+    except Exception:
+        os.unlink(tmp.name)
+        raise
+    
+    # Update environment variable in current process; it now comes from .env
     os.environ[env_var] = api_key
+    _env_file_names.add(env_var)
+    _keys_cache = None
     
     return True
\ No newline at end of file
@@ -1,10 +1,56 @@
 # core/file_manager.py
 import os
-import json
+import io
+import sys
 import datetime
 from pathlib import Path
-from typing import List, Dict, Set, Any, Optional
+from typing import List, Dict, Set, Any, Optional, Tuple, Iterator
 import re
+import threading
+from collections import OrderedDict, deque
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:
+    # orjson is optional; fall back to the standard library
+    orjson = None
+    import json
+
+# Extensions handled by the simple comment stripper in compile_files
+_HASH_COMMENT_EXTENSIONS = frozenset({'.py', '.rb'})
+_C_COMMENT_EXTENSIONS = frozenset({'.js', '.jsx', '.ts', '.tsx', '.java', '.c', '.cpp', '.cs'})
+
+# Characters not allowed in prompt IDs and output file names
+_SAFE_ID_RE = re.compile(r'[^\w\-_]')
+
+# Maximum number of file contents kept by FileManager.read_file
+READ_CACHE_SIZE = 256
+
+# Files read ahead of the one being compiled by iter_compiled_files
+READ_AHEAD = 32
+
+# Precompiled comment and docstring patterns
+_C_LINE_COMMENT_RE = re.compile(r'//.*$', re.MULTILINE)
+_C_BLOCK_COMMENT_RE = re.compile(r'/\*[\s\S]*?\*/')
+_PY_DOCSTRING_DQ_RE = re.compile(r'"""[\s\S]*?"""')
+_PY_DOCSTRING_SQ_RE = re.compile(r"'''[\s\S]*?'''")
+
+def _read_json(path) -> Any:
+    """Read and parse a JSON file."""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+def _write_json(path, data: Any):
+    """Serialize data to a JSON file with two-space indentation."""
+    if orjson:
+        raw = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        raw = json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(raw)
 
 class FileManager:
     """Manages file operations for the AI Helper tool."""
@@ -17,13 +63,25 @@ class FileManager:
             config: Configuration dictionary.
         """
         self.project_root = Path(project_root)
-        self.excluded_dirs = set(config.get("excluded_dirs", []))
-        self.core_extensions = set(config.get("core_extensions", []))
+        # String form of the root, used to derive relative paths by slicing
+        self._root_str = str(self.project_root)
+        self._root_len = len(self._root_str) + 1
+        self.excluded_dirs = frozenset(config.get("excluded_dirs", []))
+        self.core_extensions = frozenset(ext.lower() for ext in config.get("core_extensions", []))
         
         # Set up AI_HELP directory
         self.ai_help_dir = self.project_root / "AI_HELP"
         self.prompts_dir = self.ai_help_dir / "prompts"
         self.outputs_dir = self.ai_help_dir / "outputs"
+        self._ai_help_str = str(self.ai_help_dir)
+        
+        # Parsed JSON prompts keyed by prompt ID, stored with the file's mtime
+        self._prompt_cache: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        
+        # Recently read file contents keyed by (path, mtime), least recent first.
+        # compile_files reads from worker threads, hence the lock.
+        self._read_cache: "OrderedDict[Tuple[str, int], str]" = OrderedDict()
+        self._read_cache_lock = threading.Lock()
         
         # Create directories if they don't exist
         self.prompts_dir.mkdir(parents=True, exist_ok=True)
@@ -64,8 +122,7 @@ class FileManager:
         for prompt_id, prompt_data in default_prompts.items():
             prompt_path = self.prompts_dir / f"{prompt_id}.json"
             if not prompt_path.exists():
-                with open(prompt_path, 'w', encoding='utf-8') as f:
-                    json.dump(prompt_data, f, indent=2)
+                _write_json(prompt_path, prompt_data)
                     
         # Convert any existing text prompts to JSON format
         self._convert_text_prompts_to_json()
@@ -90,8 +147,7 @@ class FileManager:
                     }
                     
                     # Save as JSON
-                    with open(json_path, 'w', encoding='utf-8') as f:
-                        json.dump(prompt_data, f, indent=2)
+                    _write_json(json_path, prompt_data)
                         
                     # Optionally, remove the original .txt file
                     # txt_path.unlink()
@@ -109,40 +165,66 @@ class FileManager:
             List of file information dictionaries.
         """
         files = []
+        self._scan_directory(self._root_str, include_extensions, files)
+        return files
+    
+    def _scan_directory(self, directory: str, include_extensions: Optional[Set[str]], files: List[Dict[str, Any]]):
+        """Recursively collect file information below a directory.
         
-        # Walk through project directory
-        for root, dirs, filenames in os.walk(self.project_root):
-            # Skip excluded directories
-            dirs[:] = [d for d in dirs if d not in self.excluded_dirs and not d.startswith('.')]
-            
-            # Skip the AI_HELP directory itself
-            if Path(root) == self.ai_help_dir:
-                continue
-            
-            # Process files
-            for filename in filenames:
-                if filename.startswith('.'):
-                    continue
+        Uses os.scandir so directory type checks and sizes come from the
+        directory entries instead of separate stat calls.
+        
+        Args:
+            directory: Directory to scan.
+            include_extensions: Set of file extensions to include, or None for all.
+            files: List that file information dictionaries are appended to.
+        """
+        subdirs = []
+        
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if name.startswith('.'):
+                        continue
                     
-                file_path = Path(root) / filename
-                rel_path = file_path.relative_to(self.project_root)
-                extension = os.path.splitext(filename)[1].lower()
-                
-                # Skip if not in included extensions
-                if include_extensions is not None and extension not in include_extensions:
-                    continue
-                
-                # Add file info
-                files.append({
-                    'name': filename,
-                    'path': str(rel_path),
-                    'full_path': str(file_path),
-                    'extension': extension,
-                    'size': file_path.stat().st_size,
-                    'is_core': extension in self.core_extensions
-                })
+                    if entry.is_dir():
+                        # Prune excluded directories (and the AI_HELP directory
+                        # itself) so their subtrees are never opened
+                        if (name not in self.excluded_dirs and not entry.is_symlink()
+                                and entry.path != self._ai_help_str):
+                            subdirs.append(entry.path)
+                        continue
+                    
+                    # Dot-files were skipped above, so any dot marks an extension.
+                    # Interned so every file shares one string per extension.
+                    dot = name.rfind('.')
+                    extension = sys.intern(name[dot:].lower()) if dot > 0 else ''
+                    
+                    # Skip if not in included extensions
+                    if include_extensions is not None and extension not in include_extensions:
+                        continue
+                    
+                    try:
+                        size = entry.stat().st_size
+                    except OSError:
+                        continue  # Broken symlink or file removed mid-scan
+                    
+                    # Add file info
+                    files.append({
+                        'name': name,
+                        'path': entry.path[self._root_len:],
+                        'full_path': entry.path,
+                        'extension': extension,
+                        'size': size,
+                        'is_core': extension in self.core_extensions
+                    })
+        except OSError:
+            # Unreadable directory; skip it like os.walk does
+            return
         
-        return files
+        for subdir in subdirs:
+            self._scan_directory(subdir, include_extensions, files)
     
     def get_unique_extensions(self, files: Optional[List[Dict[str, Any]]] = None) -> Set[str]:
         if files is None:
@@ -156,72 +238,160 @@ class FileManager:
                 file_path = path
             else:
                 file_path = os.path.join(self.project_root, path)
+            
+            # Serve unchanged files from the cache
+            st = os.stat(file_path)
+            key = (file_path, st.st_mtime_ns)
+            with self._read_cache_lock:
+                content = self._read_cache.get(key)
+                if content is not None:
+                    self._read_cache.move_to_end(key)
+                    return content
                 
-            with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
-                return f.read()
+            # Read the raw bytes and decode once. The whole file is read in one
+            # go, so skip the buffering layer; readall sizes its buffer from fstat
+            with open(file_path, 'rb', buffering=0) as f:
+                raw = f.read()
+            content = raw.decode('utf-8', errors='replace')
+            
+            # Match text mode's universal newline handling
+            if '\r' in content:
+                content = content.replace('\r\n', '\n').replace('\r', '\n')
+            
+            with self._read_cache_lock:
+                self._read_cache[key] = content
+                if len(self._read_cache) > READ_CACHE_SIZE:
+                    self._read_cache.popitem(last=False)
+            
+            return content
         except Exception as e:
             return f"Error reading file: {str(e)}"
     
     def compile_files(self, files: List[Dict[str, Any]], cleaning_options=None) -> str:
+        # Stream sections into one buffer instead of joining a list of large strings
+        compiled = io.StringIO()
+        for chunk in self.iter_compiled_files(files, cleaning_options):
+            compiled.write(chunk)
+        return compiled.getvalue()
+    
+    def _iter_file_contents(self, paths: List[str]) -> Iterator[str]:
+        """Yield the contents of paths in order, reading a bounded window ahead.
+        
+        Reads run concurrently so disk latency overlaps, but at most
+        READ_AHEAD contents are held before the caller consumes them.
+        
+        Args:
+            paths: Full paths of the files to read.
+        """
+        if len(paths) == 1:
+            yield self.read_file(paths[0])
+            return
+        
+        with ThreadPoolExecutor(max_workers=min(READ_AHEAD, len(paths))) as executor:
+            remaining = iter(paths)
+            pending = deque(executor.submit(self.read_file, path) for path in islice(remaining, READ_AHEAD))
+            while pending:
+                content = pending.popleft().result()
+                for path in remaining:
+                    pending.append(executor.submit(self.read_file, path))
+                    break
+                yield content
+    
+    def iter_compiled_files(self, files: List[Dict[str, Any]], cleaning_options=None) -> Iterator[str]:
+        """Yield the compiled text of files piece by piece.
+        
+        Joining the pieces gives the same text as compile_files, but callers
+        writing to a file never need the whole compilation in memory at once.
+        
+        Args:
+            files: List of file information dictionaries.
+            cleaning_options: Dictionary of cleaning flags, or None.
+        """
         if not files:
-            return ""
+            return
             
         if cleaning_options is None:
             cleaning_options = {}
             
-        compiled = []
+        remove_comments = cleaning_options.get('remove_comments', False)
+        remove_blank_lines = cleaning_options.get('remove_blank_lines', False)
+        
+        contents = self._iter_file_contents([file['full_path'] for file in files])
         
-        for file in files:
-            content = self.read_file(file['full_path'])
+        for index, (file, content) in enumerate(zip(files, contents)):
             extension = file['extension']
             
             # Apply cleaning options
-            if cleaning_options.get('remove_comments', False):
-                # Simple comment removal (not perfect but works for common languages)
-                if extension in ['.py', '.rb']:
-                    # Remove Python/Ruby comments
-                    lines = []
-                    for line in content.split('\n'):
+            # Simple comment removal (not perfect but works for common languages)
+            strip_hash_comments = remove_comments and extension in _HASH_COMMENT_EXTENSIONS
+            if remove_comments and extension in _C_COMMENT_EXTENSIONS:
+                # Remove C-style comments on the whole text first since block
+                # comments can span lines
+                # Note: This is a simplified approach
+                content = _C_LINE_COMMENT_RE.sub('', content)
+                content = _C_BLOCK_COMMENT_RE.sub('', content)
+            
+            # Strip Python/Ruby comments and blank lines in a single pass
+            if strip_hash_comments or remove_blank_lines:
+                lines = []
+                # Only CRLF and LF end lines; splitlines would also break on
+                # form feeds, vertical tabs and Unicode separators
+                for line in content.replace('\r\n', '\n').split('\n'):
+                    if strip_hash_comments:
                         comment_pos = line.find('#')
                         if comment_pos >= 0:
                             line = line[:comment_pos]
-                        if line.strip():
-                            lines.append(line)
-                    content = '\n'.join(lines)
-                elif extension in ['.js', '.jsx', '.ts', '.tsx', '.java', '.c', '.cpp', '.cs']:
-                    # Remove C-style comments
-                    # Note: This is a simplified approach
-                    import re
-                    content = re.sub(r'//.*$', '', content, flags=re.MULTILINE)
-                    content = re.sub(r'/\*[\s\S]*?\*/', '', content)
-            
-            if cleaning_options.get('remove_blank_lines', False):
-                content = '\n'.join(line for line in content.split('\n') if line.strip())
+                    if line.strip():
+                        lines.append(line)
+                content = '\n'.join(lines)
             
             if cleaning_options.get('remove_docstrings', False) and extension in ['.py']:
                 # Simple Python docstring removal (not perfect)
-                import re
-                content = re.sub(r'"""[\s\S]*?"""', '', content)
-                content = re.sub(r"'''[\s\S]*?'''", '', content)
+                content = _PY_DOCSTRING_DQ_RE.sub('', content)
+                content = _PY_DOCSTRING_SQ_RE.sub('', content)
             
             # Add file separator and content
-            compiled.append(f"######## {file['path']} ########\n```{extension}\n{content}\n```\n")
+            separator = "\n" if index else ""
+            yield f"{separator}######## {file['path']} ########\n```{extension}\n"
+            yield content
+            yield "\n```\n"
+    
+    def _load_json_prompt(self, json_path: Path) -> Dict[str, Any]:
+        """Load a JSON prompt, reusing the cached copy while the file is unchanged.
+        
+        Args:
+            json_path: Path to the prompt's JSON file.
         
-        return "\n".join(compiled)
+        Returns:
+            A copy of the prompt data, safe for callers to modify.
+        """
+        prompt_id = json_path.stem
+        mtime = os.stat(json_path).st_mtime_ns
+        
+        cached = self._prompt_cache.get(prompt_id)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, _read_json(json_path))
+            self._prompt_cache[prompt_id] = cached
+        
+        return dict(cached[1])
     
-    def get_prompts(self) -> Dict[str, Dict[str, Any]]:
-        prompts = {}
+    def iter_prompts(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Lazily yield (prompt_id, prompt_data) pairs.
+        
+        Prompts are loaded one file at a time, so callers that only need
+        the first few can stop early without reading the rest.
+        """
+        seen = set()
         
         # Load JSON prompts
         for file_path in self.prompts_dir.glob('*.json'):
             prompt_id = file_path.stem
+            seen.add(prompt_id)
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    prompt_data = json.load(f)
-                    prompts[prompt_id] = prompt_data
+                yield prompt_id, self._load_json_prompt(file_path)
             except Exception as e:
                 print(f"Error loading prompt {file_path}: {str(e)}")
-                prompts[prompt_id] = {
+                yield prompt_id, {
                     "name": prompt_id,
                     "prompt": f"Error loading prompt: {str(e)}",
                     "reminder": ""
@@ -230,29 +400,29 @@ class FileManager:
         # Also load any remaining .txt files for backward compatibility
         for file_path in self.prompts_dir.glob('*.txt'):
             prompt_id = file_path.stem
-            if prompt_id not in prompts:  # Only if not already loaded as JSON
+            if prompt_id not in seen:  # Only if not already loaded as JSON
                 try:
                     with open(file_path, 'r', encoding='utf-8') as f:
                         prompt_content = f.read()
-                    prompts[prompt_id] = {
-                        "name": prompt_id.replace('_', ' ').title(),
-                        "prompt": prompt_content,
-                        "reminder": ""
-                    }
                 except Exception as e:
                     print(f"Error loading prompt {file_path}: {str(e)}")
-        
-        return prompts
+                    continue
+                yield prompt_id, {
+                    "name": prompt_id.replace('_', ' ').title(),
+                    "prompt": prompt_content,
+                    "reminder": ""
+                }
+    
+    def get_prompts(self) -> Dict[str, Dict[str, Any]]:
+        return dict(self.iter_prompts())
     
     def get_prompt(self, prompt_id: str) -> Optional[Dict[str, Any]]:
         # Try JSON first
         json_path = self.prompts_dir / f"{prompt_id}.json"
-        if json_path.exists():
-            try:
-                with open(json_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception:
-                pass
+        try:
+            return self._load_json_prompt(json_path)
+        except Exception:
+            pass
         
         # Fall back to text file for backward compatibility
         txt_path = self.prompts_dir / f"{prompt_id}.txt"
@@ -273,12 +443,13 @@ class FileManager:
     def save_prompt(self, prompt_id: str, prompt_data: Dict[str, Any]) -> bool:
         try:
             # Sanitize prompt ID for filename
-            safe_id = re.sub(r'[^\w\-_]', '_', prompt_id.lower())
+            safe_id = _SAFE_ID_RE.sub('_', prompt_id.lower())
             file_path = self.prompts_dir / f"{safe_id}.json"
             
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(prompt_data, f, indent=2)
-                
+            self.prompts_dir.mkdir(parents=True, exist_ok=True)
+            _write_json(file_path, prompt_data)
+            self._prompt_cache.pop(safe_id, None)
+            
             return True
         except Exception as e:
             print(f"Error saving prompt: {str(e)}")
@@ -288,6 +459,7 @@ class FileManager:
         try:
             # Try to delete JSON file
             json_path = self.prompts_dir / f"{prompt_id}.json"
+            self._prompt_cache.pop(prompt_id, None)
             if json_path.exists():
                 os.remove(json_path)
                 return True
@@ -303,18 +475,31 @@ class FileManager:
             return False
     
     def save_output(self, content, task_name):
+        """Save output text to a new file in the outputs directory.
+        
+        Args:
+            content: Text to save, or an iterable of text chunks written as they come.
+            task_name: Task name used in the filename.
+            
+        Returns:
+            Path of the saved file, or None on error.
+        """
         # Generate filename
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
         project_name = self.project_root.name
-        safe_task = re.sub(r'[^\w\-_]', '_', task_name)
+        safe_task = _SAFE_ID_RE.sub('_', task_name)
         filename = f"{project_name}_{safe_task}_{timestamp}.txt"
         
         # Save file
         output_path = self.outputs_dir / filename
         
         try:
+            self.outputs_dir.mkdir(parents=True, exist_ok=True)
             with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+                if isinstance(content, str):
+                    f.write(content)
+                else:
+                    f.writelines(content)
                 
             return str(output_path)
         except Exception as e:
@@ -1,19 +1,71 @@
 # core/llm_service.py
 import os
-import json
 import requests
-import anthropic
-import openai
-import google.generativeai as genai
+from requests.adapters import HTTPAdapter
 from typing import Dict, Any, Optional, Callable
 import importlib.util
 
+try:
+    from orjson import dumps as _json_dumps, loads as _json_loads
+except ImportError:
+    # orjson is optional; the standard library produces the same payloads
+    import json
+    
+    def _json_dumps(data: Any) -> bytes:
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    
+    _json_loads = json.loads
+
+# (connect, read) timeouts in seconds for provider HTTP requests
+REQUEST_TIMEOUT = (10, 600)
+
+# Official API origins; replies are only streamed (and OpenAI's stream_options
+# only sent) to these unless the provider config says otherwise
+ANTHROPIC_API_ORIGIN = "https://api.anthropic.com/"
+OPENAI_API_ORIGIN = "https://api.openai.com/"
+
+# Shared by all LLMService instances; created on first use
+_session = None
+
+def _get_session() -> requests.Session:
+    """Return the module-wide HTTP session, creating it on first use.
+    
+    Keep-alive connections (and their TLS handshakes) carry over between
+    requests and between LLMService instances.
+    """
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        _session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0))
+    return _session
+
+def _is_event_stream(response) -> bool:
+    """Check whether a response is a server-sent event stream rather than JSON."""
+    return response.headers.get("content-type", "").startswith("text/event-stream")
+
+# Stands in for the prompt in cached request bodies
+_PROMPT_PLACEHOLDER = "\x00prompt\x00"
+
+def _split_body_template(data: Dict[str, Any]):
+    """Serialize a request body around the prompt placeholder.
+    
+    Args:
+        data: Request body with _PROMPT_PLACEHOLDER as the message content.
+        
+    Returns:
+        Tuple of (prefix, suffix, data) where prefix + _json_dumps(prompt) + suffix
+        is the serialized body for a given prompt.
+    """
+    prefix, suffix = _json_dumps(data).split(_json_dumps(_PROMPT_PLACEHOLDER), 1)
+    return prefix, suffix, data
+
 class LLMService:
     def __init__(self, config: Dict, api_key: Optional[str] = None):
         self.config = config
         self.api_key = api_key
         self.api_provider = config.get("default_api", "anthropic")
         self.api_config = config["api"].get(self.api_provider, {})
+        self._index_models()
 
         # Set default model ID but don't configure parameters yet
         self.model_id = self.api_config.get("default_model")
@@ -26,8 +78,26 @@ class LLMService:
         # Track usage
         self.last_usage = {}
         
+        # Request headers and serialized body for the current settings, built
+        # on first use and reset by the setters below
+        self._headers = None
+        self._body_template = None
+        
+        # Pooled HTTP session shared with other instances
+        self._session = _get_session()
+        
+        # Request method for each provider
+        self._dispatch = {
+            "anthropic": self._anthropic_request,
+            "openai": self._openai_request,
+            "gemini": self._gemini_request
+        }
+        
         # Initialize provider-specific clients as needed
         self.gemini_client = None
+        
+        # Gemini GenerativeModel objects keyed by model ID and generation config
+        self._gemini_models = {}
 
         # Configure parameters once we know which model we're using
         if self.model_id:
@@ -39,6 +109,7 @@ class LLMService:
     
     def configure_for_model(self):
         """Configure optimal parameters based on selected model capabilities."""
+        self._body_template = None
         if not self.model_id:
             return
             
@@ -91,17 +162,22 @@ class LLMService:
     
     def set_api_key(self, api_key: str):
         self.api_key = api_key
+        self._headers = None
         
         # Reset client if provider is Gemini
         if self.api_provider == "gemini":
             self.gemini_client = None
+            self._gemini_models = {}
     
     def set_provider(self, provider: str):
         if provider in self.config["api"]:
             previous_provider = self.api_provider
             self.api_provider = provider
             self.api_config = self.config["api"][provider]
+            self._index_models()
             self.model_id = self.api_config.get("default_model")
+            self._headers = None
+            self._body_template = None
             
             # Clear any model-specific attributes
             for attr in ['use_extended_thinking', 'extended_thinking_budget', 
@@ -112,6 +188,7 @@ class LLMService:
             # Clear provider-specific clients if changing providers
             if previous_provider != provider and provider == "gemini":
                 self.gemini_client = None
+                self._gemini_models = {}
             
             # Configure for new provider/model
             self.configure_for_model()
@@ -120,6 +197,8 @@ class LLMService:
     
     def set_model(self, model_id: str):
         self.model_id = model_id
+        self._headers = None
+        self._body_template = None
         
         # Clear any model-specific attributes
         for attr in ['use_extended_thinking', 'extended_thinking_budget', 'reasoning_effort']:
@@ -131,6 +210,7 @@ class LLMService:
     
     def set_parameter(self, param_name: str, value: Any):
         self.parameters[param_name] = value
+        self._body_template = None
     
     def set_extended_thinking(self, enabled: bool, budget: Optional[int] = None):
         model_caps = self._get_model_capabilities()
@@ -141,6 +221,7 @@ class LLMService:
         if budget is not None:
             max_budget = model_caps.get("max_tokens_extended", 64000)
             self.extended_thinking_budget = min(budget, max_budget)
+        self._body_template = None
         return True
     
     def set_thinking(self, enabled: bool):
@@ -161,13 +242,31 @@ class LLMService:
             return False
         
         self.reasoning_effort = effort
+        self._body_template = None
         return True
     
+    def _index_models(self):
+        """Map the current provider's model IDs to their config entries and capabilities."""
+        self._models_by_id = {model.get("id"): model for model in self.api_config.get("models", [])}
+        self._caps_by_model = {
+            model_id: model.get("capabilities", {})
+            for model_id, model in self._models_by_id.items()
+        }
+    
     def _get_model_capabilities(self):
-        for model in self.api_config.get("models", []):
-            if model.get("id") == self.model_id:
-                return model.get("capabilities", {})
-        return {}
+        return self._caps_by_model.get(self.model_id, {})
+    
+    def get_model_name(self, model_id: Optional[str] = None) -> str:
+        """Get the display name of a model.
+        
+        Args:
+            model_id: Model ID to look up; defaults to the current model.
+            
+        Returns:
+            The model's configured name, or "Unknown Model".
+        """
+        model = self._models_by_id.get(self.model_id if model_id is None else model_id, {})
+        return model.get("name", "Unknown Model")
     
     def get_available_providers(self):
         return list(self.config["api"].keys())
@@ -186,139 +285,318 @@ class LLMService:
         if on_progress:
             on_progress(10)
         
+        request = self._dispatch.get(self.api_provider)
+        if request is None:
+            return f"Error: Unsupported provider {self.api_provider}"
+        
         try:
-            if self.api_provider == "anthropic":
-                return self._anthropic_request(prompt, on_progress)
-            elif self.api_provider == "openai":
-                return self._openai_request(prompt, on_progress)
-            elif self.api_provider == "gemini":
-                return self._gemini_request(prompt, on_progress)
-            else:
-                return f"Error: Unsupported provider {self.api_provider}"
+            return request(prompt, on_progress)
         except Exception as e:
             return f"Error: {str(e)}"
     
     def _anthropic_request(self, prompt: str, on_progress: Optional[Callable[[int], None]] = None) -> str:
         api_url = self.api_config.get("url", "https://api.anthropic.com/v1/messages")
-        api_version = self.api_config.get("version", "2023-06-01")
-        
-        headers = {
-            "x-api-key": self.api_key,
-            "anthropic-version": api_version,
-            "content-type": "application/json"
-        }
-        
         model_caps = self._get_model_capabilities()
-        if model_caps.get("supports_long_output", False):
-            headers["anthropic-beta"] = "output-128k-2025-02-19"
-        
-        data = {
-            "model": self.model_id,
-            "messages": [
-                {"role": "user", "content": prompt}
-            ]
-        }
         
-        # Add extended thinking if supported and enabled
-        if hasattr(self, 'use_extended_thinking') and self.use_extended_thinking and model_caps.get("supports_extended_thinking", False):
-            data["thinking"] = {
-                "type": "enabled",
-                "budget_tokens": self.extended_thinking_budget
+        # Read the cached headers once; a setter may clear them meanwhile
+        headers = self._headers
+        if headers is None:
+            headers = {
+                "x-api-key": self.api_key,
+                "anthropic-version": self.api_config.get("version", "2023-06-01"),
+                "content-type": "application/json"
             }
+            if model_caps.get("supports_long_output", False):
+                headers["anthropic-beta"] = "output-128k-2025-02-19"
+            self._headers = headers
+        
+        # Work from a local so a settings change on another thread can't
+        # clear the template between building and using it
+        template = self._body_template
+        if template is None:
+            data = {
+                "model": self.model_id,
+                "messages": [
+                    {"role": "user", "content": _PROMPT_PLACEHOLDER}
+                ]
+            }
+            
+            # Add extended thinking if supported and enabled
+            if hasattr(self, 'use_extended_thinking') and self.use_extended_thinking and model_caps.get("supports_extended_thinking", False):
+                data["thinking"] = {
+                    "type": "enabled",
+                    "budget_tokens": self.extended_thinking_budget
+                }
+            
+            # Add other parameters
+            for param, value in self.parameters.items():
+                data[param] = value
+            
+            # Stream the reply as server-sent events so progress follows the
+            # generated text and long outputs don't sit on an idle connection.
+            # Other endpoints may reject streaming, so they opt in via "stream".
+            if self.api_config.get("stream", api_url.startswith(ANTHROPIC_API_ORIGIN)):
+                data["stream"] = True
+            
+            template = self._body_template = _split_body_template(data)
         
-        # Add other parameters
-        for param, value in self.parameters.items():
-            data[param] = value
+        prefix, suffix, data = template
         
         if on_progress:
             on_progress(30)
         
-        response = requests.post(api_url, headers=headers, json=data)
+        body = prefix + _json_dumps(prompt) + suffix
+        with self._session.post(api_url, headers=headers, data=body,
+                                stream=True, timeout=REQUEST_TIMEOUT) as response:
+            if response.status_code != 200:
+                return f"Error: API returned status code {response.status_code}\n{response.text}"
+            
+            if not _is_event_stream(response):
+                return self._read_anthropic_body(response, on_progress)
+            
+            return self._read_anthropic_stream(response, data.get("max_tokens"), on_progress)
+    
+    def _read_anthropic_body(self, response, on_progress: Optional[Callable[[int], None]] = None) -> str:
+        """Collect the response text from a non-streamed Anthropic reply.
+        
+        Args:
+            response: Response from the Messages API with a JSON body.
+            on_progress: Callback function for progress updates.
+            
+        Returns:
+            Response text or error message.
+        """
+        result = _json_loads(response.content)
+        if not result.get("content"):
+            return "Error: Empty response from API"
+        
+        response_text = "".join(
+            block.get("text", "") for block in result["content"] if block.get("type") == "text"
+        )
+        
+        if "usage" in result:
+            self.last_usage = result["usage"]
         
         if on_progress:
-            on_progress(90)
-        
-        if response.status_code == 200:
-            result = response.json()
-            if "content" in result and len(result["content"]) > 0:
-                response_text = ""
-                for content_block in result["content"]:
-                    if content_block.get("type") == "text":
-                        response_text += content_block.get("text", "")
-                
-                if "usage" in result:
-                    self.last_usage = result["usage"]
+            on_progress(100)
+        
+        return response_text
+    
+    def _read_anthropic_stream(self, response, max_tokens: Optional[int] = None,
+                               on_progress: Optional[Callable[[int], None]] = None) -> str:
+        """Collect the response text from an Anthropic server-sent event stream.
+        
+        Args:
+            response: Streaming response from the Messages API.
+            max_tokens: Requested output limit, used to scale progress updates.
+            on_progress: Callback function for progress updates.
+            
+        Returns:
+            Response text or error message.
+        """
+        text_parts = []
+        generated_chars = 0
+        usage = {}
+        last_progress = 30
+        
+        for line in response.iter_lines():
+            if not line.startswith(b"data:"):
+                continue
+            
+            event = _json_loads(line[5:])
+            event_type = event.get("type")
+            
+            if event_type == "content_block_delta":
+                delta = event.get("delta", {})
+                if delta.get("type") == "text_delta":
+                    text = delta.get("text", "")
+                    text_parts.append(text)
+                    generated_chars += len(text)
+                elif delta.get("type") == "thinking_delta":
+                    # Thinking counts towards max_tokens but is not returned
+                    generated_chars += len(delta.get("thinking", ""))
                 
-                if on_progress:
-                    on_progress(100)
-                    
-                return response_text
-            else:
-                return "Error: Empty response from API"
-        else:
-            return f"Error: API returned status code {response.status_code}\n{response.text}"
+                # Scale 30-90% by the rough token count (4 chars per token)
+                if on_progress and max_tokens:
+                    progress = 30 + int(60 * min(1.0, generated_chars / 4 / max_tokens))
+                    if progress > last_progress:
+                        last_progress = progress
+                        on_progress(progress)
+            elif event_type == "message_start":
+                usage.update(event.get("message", {}).get("usage", {}))
+            elif event_type == "message_delta":
+                usage.update(event.get("usage", {}))
+            elif event_type == "error":
+                error = event.get("error", {})
+                return f"Error: {error.get('type', 'api_error')}: {error.get('message', '')}"
+        
+        if not text_parts:
+            return "Error: Empty response from API"
+        
+        self.last_usage = usage
+        
+        if on_progress:
+            on_progress(100)
+        
+        return "".join(text_parts)
     
     def _openai_request(self, prompt: str, on_progress: Optional[Callable[[int], None]] = None) -> str:
         api_url = self.api_config.get("url", "https://api.openai.com/v1/chat/completions")
         
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        model_caps = self._get_model_capabilities()
+        # Read the cached headers once; a setter may clear them meanwhile
+        headers = self._headers
+        if headers is None:
+            headers = self._headers = {
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
+            }
         
-        data = {
-            "model": self.model_id,
-            "messages": [
-                {"role": "user", "content": prompt}
-            ]
-        }
+        # Work from a local so a settings change on another thread can't
+        # clear the template between building and using it
+        template = self._body_template
+        if template is None:
+            supports_reasoning = self._get_model_capabilities().get("supports_reasoning", False)
+            
+            data = {
+                "model": self.model_id,
+                "messages": [
+                    {"role": "user", "content": _PROMPT_PLACEHOLDER}
+                ]
+            }
+            
+            # Configure request based on model type
+            if supports_reasoning:
+                # For reasoning models, use max_completion_tokens
+                if "max_tokens" in self.parameters:
+                    data["max_completion_tokens"] = self.parameters["max_tokens"]
+                
+                # Add reasoning_effort if available
+                if hasattr(self, 'reasoning_effort'):
+                    data["reasoning_effort"] = self.reasoning_effort
+            else:
+                # For standard models, use max_tokens
+                if "max_tokens" in self.parameters:
+                    data["max_tokens"] = self.parameters["max_tokens"]
+            
+            # Add remaining parameters
+            for param, value in self.parameters.items():
+                if param != "max_tokens" or not supports_reasoning:
+                    data[param] = value
+            
+            # Stream replies from the official endpoint; OpenAI-compatible
+            # servers may reject streaming, so they opt in via "stream"
+            if self.api_config.get("stream", api_url.startswith(OPENAI_API_ORIGIN)):
+                data["stream"] = True
+                
+                # Ask for the token usage in the final chunk; OpenAI-compatible
+                # servers often reject stream_options, so by default it is only
+                # sent to the official endpoint
+                if self.api_config.get("stream_usage", api_url.startswith(OPENAI_API_ORIGIN)):
+                    data["stream_options"] = {"include_usage": True}
+            
+            template = self._body_template = _split_body_template(data)
         
-        # Configure request based on model type
-        if model_caps.get("supports_reasoning", False):
-            # For reasoning models, use max_completion_tokens
-            if "max_tokens" in self.parameters:
-                data["max_completion_tokens"] = self.parameters["max_tokens"]
-            
-            # Add reasoning_effort if available
-            if hasattr(self, 'reasoning_effort'):
-                data["reasoning_effort"] = self.reasoning_effort
-        else:
-            # For standard models, use max_tokens
-            if "max_tokens" in self.parameters:
-                data["max_tokens"] = self.parameters["max_tokens"]
-        
-        # Add remaining parameters
-        for param, value in self.parameters.items():
-            if param != "max_tokens" or not model_caps.get("supports_reasoning", False):
-                data[param] = value
+        prefix, suffix, data = template
+        max_tokens = data.get("max_completion_tokens", data.get("max_tokens"))
         
         if on_progress:
             on_progress(30)
         
-        response = requests.post(api_url, headers=headers, json=data)
+        body = prefix + _json_dumps(prompt) + suffix
+        with self._session.post(api_url, headers=headers, data=body,
+                                stream=True, timeout=REQUEST_TIMEOUT) as response:
+            if response.status_code != 200:
+                return f"Error: API returned status code {response.status_code}\n{response.text}"
+            
+            if not _is_event_stream(response):
+                return self._read_openai_body(response, on_progress)
+            
+            return self._read_openai_stream(response, max_tokens, on_progress)
+    
+    def _read_openai_body(self, response, on_progress: Optional[Callable[[int], None]] = None) -> str:
+        """Collect the response text from a non-streamed chat completions reply.
+        
+        Args:
+            response: Response from the Chat Completions API with a JSON body.
+            on_progress: Callback function for progress updates.
+            
+        Returns:
+            Response text or error message.
+        """
+        result = _json_loads(response.content)
+        if not result.get("choices"):
+            return "Error: Empty response from API"
+        
+        response_text = result["choices"][0].get("message", {}).get("content") or ""
+        
+        if "usage" in result:
+            self.last_usage = result["usage"]
         
         if on_progress:
-            on_progress(90)
+            on_progress(100)
+        
+        return response_text
+    
+    def _read_openai_stream(self, response, max_tokens: Optional[int] = None,
+                            on_progress: Optional[Callable[[int], None]] = None) -> str:
+        """Collect the response text from an OpenAI chat completions stream.
         
-        if response.status_code == 200:
-            result = response.json()
+        Args:
+            response: Streaming response from the Chat Completions API.
+            max_tokens: Requested output limit, used to scale progress updates.
+            on_progress: Callback function for progress updates.
             
-            if "choices" in result and len(result["choices"]) > 0:
-                response_text = result["choices"][0]["message"]["content"]
-                
-                if "usage" in result:
-                    self.last_usage = result["usage"]
+        Returns:
+            Response text or error message.
+        """
+        text_parts = []
+        generated_chars = 0
+        received_choice = False
+        usage = {}
+        last_progress = 30
+        
+        for line in response.iter_lines():
+            if not line.startswith(b"data:"):
+                continue
+            
+            payload = line[5:].strip()
+            if payload == b"[DONE]":
+                break
+            
+            chunk = _json_loads(payload)
+            if "error" in chunk:
+                error = chunk["error"] or {}
+                return f"Error: {error.get('type', 'api_error')}: {error.get('message', '')}"
+            
+            if chunk.get("usage"):
+                usage = chunk["usage"]
+            
+            choices = chunk.get("choices")
+            if not choices:
+                continue
+            
+            received_choice = True
+            text = choices[0].get("delta", {}).get("content")
+            if text:
+                text_parts.append(text)
+                generated_chars += len(text)
                 
-                if on_progress:
-                    on_progress(100)
-                    
-                return response_text
-            else:
-                return "Error: Empty response from API"
-        else:
-            return f"Error: API returned status code {response.status_code}\n{response.text}"
+                # Scale 30-90% by the rough token count (4 chars per token)
+                if on_progress and max_tokens:
+                    progress = 30 + int(60 * min(1.0, generated_chars / 4 / max_tokens))
+                    if progress > last_progress:
+                        last_progress = progress
+                        on_progress(progress)
+        
+        if not received_choice:
+            return "Error: Empty response from API"
+        
+        self.last_usage = usage
+        
+        if on_progress:
+            on_progress(100)
+        
+        return "".join(text_parts)
     
     def _gemini_request(self, prompt: str, on_progress: Optional[Callable[[int], None]] = None) -> str:
         """Send a request to the Google Gemini API.
@@ -343,18 +621,25 @@ class LLMService:
             model_caps = self._get_model_capabilities()
             
             # Configure generation parameters
-            generation_config = {
-                "temperature": self.parameters.get("temperature", 0.7),
-                "max_output_tokens": self.parameters.get("max_output_tokens", 8192),
-                "top_p": self.parameters.get("top_p", 1.0),
-                "top_k": self.parameters.get("top_k", 32)
-            }
+            temperature = self.parameters.get("temperature", 0.7)
+            max_output_tokens = self.parameters.get("max_output_tokens", 8192)
+            top_p = self.parameters.get("top_p", 1.0)
+            top_k = self.parameters.get("top_k", 32)
             
-            # Create model
-            model = self.gemini_client.GenerativeModel(
-                model_name=self.model_id,
-                generation_config=generation_config
-            )
+            # Reuse the model object while the model and settings are unchanged
+            fingerprint = (self.model_id, temperature, max_output_tokens, top_p, top_k)
+            model = self._gemini_models.get(fingerprint)
+            if model is None:
+                model = self.gemini_client.GenerativeModel(
+                    model_name=self.model_id,
+                    generation_config={
+                        "temperature": temperature,
+                        "max_output_tokens": max_output_tokens,
+                        "top_p": top_p,
+                        "top_k": top_k
+                    }
+                )
+                self._gemini_models[fingerprint] = model
             
             if on_progress:
                 on_progress(40)
@@ -2,144 +2,208 @@
 import os
 import json
 from pathlib import Path
-from typing import Dict, Any, Optional
+import io
+import functools
+import hashlib
+import re
+import threading
+import tokenize
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+from core.api_keys import get_key, save_key
+
+# Patterns used by clean_code, applied to the whole text at once
+_HASH_COMMENT_RE = re.compile(r'#[^\n]*')
+_SLASH_COMMENT_RE = re.compile(r'//[^\n]*')
+_COMMENT_RE_BY_EXTENSION = {
+    **dict.fromkeys(('.py', '.rb', '.sh'), _HASH_COMMENT_RE),
+    **dict.fromkeys(('.js', '.jsx', '.ts', '.tsx', '.java', '.c', '.cpp', '.cs', '.php'), _SLASH_COMMENT_RE)
+}
+_DOCSTRING_RE = re.compile(r'''^[^\S\n]*("""|\'\'\')[\s\S]*?\1[^\n]*(?:\n|\Z)''', re.MULTILINE)
+_BLANK_LINES_RE = re.compile(r'\A(?:[^\S\n]*(?:\n|\Z))+|\n[^\S\n]*(?=\n|\Z)')
+
+# Recent clean_code results keyed by (content digest, extension, options),
+# least recently used first
+CLEAN_CACHE_SIZE = 512
+_clean_cache: "OrderedDict[Tuple[bytes, str, Tuple], str]" = OrderedDict()
+_clean_cache_lock = threading.Lock()
+
+# Icons shipped in resources/icons next to the core package
+_ICONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'resources', 'icons')
+_ICON_MAP = {
+    '.py': 'file_py.png',
+    '.js': 'file_js.png',
+    '.jsx': 'file_jsx.png',
+    '.ts': 'file_ts.png',
+    '.tsx': 'file_tsx.png',
+    '.html': 'file_html.png',
+    '.css': 'file_css.png',
+    '.json': 'file_json.png',
+    '.yml': 'file_yaml.png',
+    '.yaml': 'file_yaml.png',
+    '.md': 'file_md.png',
+    '.txt': 'file_txt.png',
+    '.java': 'file_java.png',
+    '.c': 'file_c.png',
+    '.cpp': 'file_cpp.png',
+    '.h': 'file_h.png',
+    '.cs': 'file_cs.png',
+    '.php': 'file_php.png',
+    '.rb': 'file_rb.png',
+    '.go': 'file_go.png',
+    '.rs': 'file_rs.png',
+    '.swift': 'file_swift.png',
+    '.sql': 'file_sql.png'
+}
+
+# Units used by format_file_size
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+_SIZE_DIVISORS = tuple(1024 ** i for i in range(len(_SIZE_UNITS)))
 
 class ApiKeyManager:
 
     
     @staticmethod
     def save_api_key(config, provider: str, api_key: str):
-        from core.api_keys import save_key
         return save_key(config, provider, api_key)
     
     @staticmethod
     def get_api_key(config, provider: str):
-        from core.api_keys import load_keys
-        keys = load_keys(config)
-        return keys.get(provider, "")
+        return get_key(config, provider)
     
     @staticmethod
     def delete_api_key(config, provider: str):
-        from core.api_keys import save_key
         return save_key(config, provider, "")
 
+def _strip_python(content: str, remove_docstrings: bool, remove_comments: bool) -> str:
+    # Work from tokens so '#' and triple quotes inside string literals are left alone.
+    # Raises tokenize.TokenError or SyntaxError if the source cannot be tokenized.
+    lines = io.StringIO(content).readlines()
+    drop_rows = set()
+    cut_columns = {}
+    
+    previous = None  # Type of the last significant token
+    candidate = None  # Rows of a string that may turn out to be a docstring
+    
+    for token in tokenize.generate_tokens(iter(lines).__next__):
+        if token.type == tokenize.COMMENT:
+            if remove_comments:
+                cut_columns[token.start[0]] = token.start[1]
+            continue
+        if token.type == tokenize.NL:
+            continue
+        
+        if candidate and token.type in (tokenize.NEWLINE, tokenize.ENDMARKER):
+            # The string was a statement of its own at the start of a block
+            drop_rows.update(range(candidate[0], candidate[1] + 1))
+        candidate = None
+        
+        if remove_docstrings and token.type == tokenize.STRING and previous in (None, tokenize.INDENT):
+            candidate = (token.start[0], token.end[0])
+        previous = token.type
+    
+    # Nothing to remove; hand back the original string without copying
+    if not drop_rows and not cut_columns:
+        return content
+    
+    result = io.StringIO()
+    for row, line in enumerate(lines, 1):
+        if row in drop_rows:
+            continue
+        if row in cut_columns:
+            result.write(line[:cut_columns[row]])
+            if line.endswith('\n'):
+                result.write('\n')
+        else:
+            result.write(line)
+    
+    return result.getvalue()
+
 def clean_code(content: str, extension: str, options: Dict[str, bool]) -> str:
 
     if not options:
         return content
-        
-    lines = content.split('\n')
-    result = []
     
-    # Handle docstrings and comments
-    in_docstring = False
-    docstring_delimiter = None
+    # Reuse the result for content already cleaned with the same options
+    digest = hashlib.blake2b(content.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+    key = (digest, extension, tuple(sorted(options.items())))
+    with _clean_cache_lock:
+        cleaned = _clean_cache.get(key)
+        if cleaned is not None:
+            _clean_cache.move_to_end(key)
+            return cleaned
     
-    for line in lines:
-        # Skip blank lines if option is enabled
-        if options.get('remove_blank_lines', False) and not line.strip():
-            continue
-            
-        # Handle Python docstrings
-        if extension == '.py' and options.get('remove_docstrings', False):
-            if not in_docstring:
-                # Check for docstring start
-                stripped = line.strip()
-                if stripped.startswith('"""') or stripped.startswith("'''"):
-                    docstring_delimiter = stripped[:3]
-                    in_docstring = True
-                    if stripped.endswith(docstring_delimiter) and len(stripped) > 3:
-                        # Single-line docstring
-                        in_docstring = False
-                    continue
-            else:
-                # Check for docstring end
-                if docstring_delimiter and line.strip().endswith(docstring_delimiter):
-                    in_docstring = False
-                    docstring_delimiter = None
-                continue
-        
-        # Skip if we're in a docstring
-        if in_docstring:
-            continue
-            
-        # Handle comments
-        if options.get('remove_comments', False):
-            if extension in ['.py', '.rb', '.sh']:
-                # Python/Ruby/Shell-style comments
-                comment_pos = line.find('#')
-                if comment_pos >= 0:
-                    line = line[:comment_pos]
-            elif extension in ['.js', '.jsx', '.ts', '.tsx', '.java', '.c', '.cpp', '.cs', '.php']:
-                # C-style comments
-                comment_pos = line.find('//')
-                if comment_pos >= 0:
-                    line = line[:comment_pos]
-        
-        # Add line if it has content or we're not skipping blank lines
-        if line.strip() or not options.get('remove_blank_lines', False):
-            result.append(line)
+    cleaned = _clean_code(content, extension, options)
     
-    return '\n'.join(result)
+    with _clean_cache_lock:
+        _clean_cache[key] = cleaned
+        if len(_clean_cache) > CLEAN_CACHE_SIZE:
+            _clean_cache.popitem(last=False)
+    
+    return cleaned
+
+def _clean_code(content: str, extension: str, options: Dict[str, bool]) -> str:
+    # Normalize line endings to LF so the patterns and tokenizer see one form
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    
+    remove_docstrings = options.get('remove_docstrings', False)
+    remove_comments = options.get('remove_comments', False)
+    
+    # Python goes through the tokenizer; fall back to the patterns below
+    # for sources it rejects
+    if extension == '.py' and (remove_docstrings or remove_comments):
+        try:
+            content = _strip_python(content, remove_docstrings, remove_comments)
+            remove_docstrings = remove_comments = False
+        except (tokenize.TokenError, SyntaxError):
+            pass
+    
+    # Handle Python docstrings (whole lines starting with a triple quote)
+    if extension == '.py' and remove_docstrings:
+        content = _DOCSTRING_RE.sub('', content)
+    
+    # Handle comments
+    comment_re = _COMMENT_RE_BY_EXTENSION.get(extension) if remove_comments else None
+    if comment_re:
+        content = comment_re.sub('', content)
+    
+    # Skip blank lines if option is enabled
+    if options.get('remove_blank_lines', False):
+        content = _BLANK_LINES_RE.sub('', content)
+    
+    return content
 
 def estimate_tokens(text: str) -> int:
     return len(text) // 4
 
 def format_file_size(size_bytes: int) -> str:
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if size_bytes < 1024:
-            return f"{size_bytes:.1f} {unit}" if size_bytes >= 100 else f"{size_bytes:.2f} {unit}"
-        size_bytes /= 1024
-    return f"{size_bytes:.2f} TB"
+    # Pick the unit from the bit length (each unit is 2**10 times the last)
+    index = min(4, (int(size_bytes).bit_length() - 1) // 10) if size_bytes >= 1024 else 0
+    unit = _SIZE_UNITS[index]
+    value = size_bytes / _SIZE_DIVISORS[index]
+    if value >= 100 and unit != 'TB':
+        return f"{value:.1f} {unit}"
+    return f"{value:.2f} {unit}"
 
+@functools.lru_cache(maxsize=128)
 def get_file_icon_path(extension: str) -> str:
-    icon_map = {
-        '.py': 'file_py.png',
-        '.js': 'file_js.png',
-        '.jsx': 'file_jsx.png',
-        '.ts': 'file_ts.png',
-        '.tsx': 'file_tsx.png',
-        '.html': 'file_html.png',
-        '.css': 'file_css.png',
-        '.json': 'file_json.png',
-        '.yml': 'file_yaml.png',
-        '.yaml': 'file_yaml.png',
-        '.md': 'file_md.png',
-        '.txt': 'file_txt.png',
-        '.java': 'file_java.png',
-        '.c': 'file_c.png',
-        '.cpp': 'file_cpp.png',
-        '.h': 'file_h.png',
-        '.cs': 'file_cs.png',
-        '.php': 'file_php.png',
-        '.rb': 'file_rb.png',
-        '.go': 'file_go.png',
-        '.rs': 'file_rs.png',
-        '.swift': 'file_swift.png',
-        '.sql': 'file_sql.png'
-    }
-
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    resources_dir = os.path.join(os.path.dirname(script_dir), 'resources', 'icons')
-
-    icon_file = icon_map.get(extension.lower(), 'file_generic.png')
-    icon_path = os.path.join(resources_dir, icon_file)
+    icon_file = _ICON_MAP.get(extension.lower(), 'file_generic.png')
+    icon_path = os.path.join(_ICONS_DIR, icon_file)
 
     if not os.path.exists(icon_path):
-        icon_path = os.path.join(resources_dir, 'file_default.png')
+        icon_path = os.path.join(_ICONS_DIR, 'file_default.png')
 
     return icon_path
 
-def get_active_icon_paths():
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    resources_dir = os.path.join(os.path.dirname(script_dir), 'resources', 'icons')
-    
+@functools.cache
+def _active_icon_paths():
     return {
-        'folder': os.path.join(resources_dir, 'folder.png'),
-        'folder_open': os.path.join(resources_dir, 'folder_open.png'),
-        'file_generic': os.path.join(resources_dir, 'file_generic.png'),
-        'code': os.path.join(resources_dir, 'code.png'),
-        'context': os.path.join(resources_dir, 'context.png'),
-        'prompt': os.path.join(resources_dir, 'prompt.png'),
-        'reminder': os.path.join(resources_dir, 'reminder.png')
-    }
\ No newline at end of file
+        name: os.path.join(_ICONS_DIR, f'{name}.png')
+        for name in ('folder', 'folder_open', 'file_generic', 'code', 'context', 'prompt', 'reminder')
+    }
+
+def get_active_icon_paths():
+    # Copy so callers can't modify the cached mapping
+    return dict(_active_icon_paths())
@@ -1,12 +1,33 @@
 # gui/blocks.py
 from PyQt6.QtWidgets import (
     QWidget, QFrame, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QTextEdit, QMenu, QCheckBox, QDialog, QDialogButtonBox, QGridLayout,
+    QPlainTextEdit, QMenu, QCheckBox, QDialog, QDialogButtonBox, QGridLayout,
     QApplication, QMessageBox
 )
 from PyQt6.QtCore import Qt, QMimeData, QPointF, pyqtSignal
 from PyQt6.QtGui import QDrag, QMouseEvent, QIcon, QFont
-import os
+import bisect
+
+# Background color for each kind of block
+_BLOCK_COLORS = {
+    'prompt': '#F6F8FA',
+    'code': '#FFF8ED',
+    'context': '#F0F8FF',
+    'reminder': '#F0FFF0'
+}
+
+# Set once on BlocksContainer; blocks are matched by their dynamic properties
+# instead of each carrying a stylesheet of its own
+_BLOCKS_STYLESHEET = "\n".join(
+    f'QFrame[blockColor="{kind}"], QFrame[blockColor="{kind}"] QFrame '
+    f'{{ background-color: {color}; border-radius: 4px; }}'
+    for kind, color in _BLOCK_COLORS.items()
+) + """
+QWidget[blockHeader="true"], QWidget[blockHeader="true"] QWidget {
+    background-color: rgba(0, 0, 0, 0.05); border-top-left-radius: 4px; border-top-right-radius: 4px;
+}
+QLabel[blockGrip="true"] { color: gray; font-weight: bold; }
+"""
 
 class ContentBlock(QFrame):
     """Base class for draggable content blocks."""
@@ -16,18 +37,21 @@ class ContentBlock(QFrame):
     removed = pyqtSignal(int)     # Index
     edited = pyqtSignal(int, str)  # Index, new content
     
-    def __init__(self, title, content="", color="#FFFFFF", parent=None):
+    def __init__(self, title, content="", kind="prompt", parent=None):
         super().__init__(parent)
         
         self.title = title
         self.content = content
-        self.block_color = color
+        self.kind = kind  # 'prompt', 'code', 'context' or 'reminder'
+        self.block_color = _BLOCK_COLORS[kind]
         self.drag_start_position = None
+        self._container_index = -1  # Position in the container, kept by BlocksContainer
+        self._drag_threshold = QApplication.startDragDistance()
         
         # Set up styling
         self.setFrameStyle(QFrame.Shape.StyledPanel | QFrame.Shadow.Raised)
         self.setLineWidth(1)
-        self.setStyleSheet(f"QFrame {{ background-color: {color}; border-radius: 4px; }}")
+        self.setProperty('blockColor', kind)
         
         self._init_ui()
     
@@ -39,15 +63,13 @@ class ContentBlock(QFrame):
         
         # Header
         header = QWidget()
-        header.setStyleSheet(
-            f"background-color: rgba(0, 0, 0, 0.05); border-top-left-radius: 4px; border-top-right-radius: 4px;"
-        )
+        header.setProperty('blockHeader', True)
         header_layout = QHBoxLayout(header)
         header_layout.setContentsMargins(8, 4, 8, 4)
         
         # Grip icon for dragging
         grip_label = QLabel("↕")
-        grip_label.setStyleSheet("color: gray; font-weight: bold;")
+        grip_label.setProperty('blockGrip', True)
         grip_label.setCursor(Qt.CursorShape.SizeAllCursor)
         
         # Title
@@ -70,9 +92,9 @@ class ContentBlock(QFrame):
         layout.addWidget(header)
         
         # Content
-        self.content_widget = QTextEdit()
+        self.content_widget = QPlainTextEdit()
         self.content_widget.setReadOnly(True)
-        self.content_widget.setText(self.content)
+        self.content_widget.setPlainText(self.content)
         self.content_widget.setMaximumHeight(150)  # Limit maximum height
         
         layout.addWidget(self.content_widget)
@@ -86,8 +108,8 @@ class ContentBlock(QFrame):
         
         layout = QVBoxLayout(dialog)
         
-        editor = QTextEdit()
-        editor.setText(self.content)
+        editor = QPlainTextEdit()
+        editor.setPlainText(self.content)
         
         layout.addWidget(QLabel(f"Edit {self.title} Content:"))
         layout.addWidget(editor)
@@ -101,19 +123,15 @@ class ContentBlock(QFrame):
         if dialog.exec() == QDialog.DialogCode.Accepted:
             # Update content
             self.content = editor.toPlainText()
-            self.content_widget.setText(self.content)
+            self.content_widget.setPlainText(self.content)
             
             # Emit signal
-            index = self.parent().layout().indexOf(self)
-            self.edited.emit(index, self.content)
+            self.edited.emit(self._container_index, self.content)
     
     def _remove_block(self):
         """Remove the block."""
-        # Get index
-        index = self.parent().layout().indexOf(self)
-        
         # Emit signal
-        self.removed.emit(index)
+        self.removed.emit(self._container_index)
     
     def mousePressEvent(self, event):
         """Handle mouse press events for drag and drop."""
@@ -123,10 +141,12 @@ class ContentBlock(QFrame):
     
     def mouseMoveEvent(self, event):
         """Handle mouse move events for drag and drop."""
-        if not self.drag_start_position:
+        # Only a left-button press on this block can start a drag
+        if not (event.buttons() & Qt.MouseButton.LeftButton) or self.drag_start_position is None:
+            super().mouseMoveEvent(event)
             return
             
-        if (event.position() - self.drag_start_position).manhattanLength() < QApplication.startDragDistance():
+        if (event.position() - self.drag_start_position).manhattanLength() < self._drag_threshold:
             return
             
         # Start drag
@@ -135,11 +155,8 @@ class ContentBlock(QFrame):
         mime_data.setText(self.title)
         drag.setMimeData(mime_data)
         
-        # Get index
-        index = self.parent().layout().indexOf(self)
-        
         # Execute drag
-        result = drag.exec(Qt.DropAction.MoveAction)
+        drag.exec(Qt.DropAction.MoveAction)
         
         # Reset drag start position
         self.drag_start_position = None
@@ -148,13 +165,13 @@ class PromptBlock(ContentBlock):
     """Block for prompt content."""
     
     def __init__(self, content="", parent=None):
-        super().__init__("Prompt", content, "#F6F8FA", parent)
+        super().__init__("Prompt", content, "prompt", parent)
 
 class CodeBlock(ContentBlock):
     """Block for code files."""
     
     def __init__(self, content="", parent=None):
-        super().__init__("Code Files", content, "#FFF8ED", parent)
+        super().__init__("Code Files", content, "code", parent)
         
         # Add cleaning options button
         header_widget = self.layout().itemAt(0).widget()
@@ -206,30 +223,17 @@ class CodeBlock(ContentBlock):
             if not any(cleaning_options.values()):
                 return
             
-            # Get file extensions from the content
-            file_paths = self.content.strip().split('\n')
-            
-            # Clean each file based on its extension
-            cleaned_content = []
-            for path in file_paths:
-                path = path.strip()
-                if not path:
-                    continue
-                
-                # Determine file extension for proper cleaning
-                extension = os.path.splitext(path)[1].lower()
-                
-                # Only add the path to the cleaned content
-                cleaned_content.append(path)
+            # Keep the non-empty lines of the file list; the files themselves
+            # are cleaned when the output is compiled
+            cleaned_content = [line.strip() for line in self.content.splitlines() if line.strip()]
             
             # Update the content
             if cleaned_content:
                 self.content = '\n'.join(cleaned_content)
-                self.content_widget.setText(self.content)
+                self.content_widget.setPlainText(self.content)
                 
                 # Emit signal to update the content
-                index = self.parent().layout().indexOf(self)
-                self.edited.emit(index, self.content)
+                self.edited.emit(self._container_index, self.content)
                 
                 # Show confirmation message
                 QMessageBox.information(
@@ -245,13 +249,13 @@ class ContextBlock(ContentBlock):
     """Block for context files."""
     
     def __init__(self, content="", parent=None):
-        super().__init__("Context Files", content, "#F0F8FF", parent)
+        super().__init__("Context Files", content, "context", parent)
 
 class ReminderBlock(ContentBlock):
     """Block for reminder content."""
     
     def __init__(self, content="", parent=None):
-        super().__init__("Reminder", content, "#F0FFF0", parent)
+        super().__init__("Reminder", content, "reminder", parent)
 
 class BlocksContainer(QWidget):
     """Container for content blocks."""
@@ -260,12 +264,19 @@ class BlocksContainer(QWidget):
         super().__init__(parent)
         
         self.setAcceptDrops(True)
+        self.setStyleSheet(_BLOCKS_STYLESHEET)
         
         # Set up layout
         self.blocks_layout = QVBoxLayout(self)
         self.blocks_layout.setContentsMargins(0, 0, 0, 0)
         self.blocks_layout.setSpacing(8)
         self.blocks_layout.addStretch()
+        
+        # Vertical midpoints of the blocks, captured when a drag enters
+        self._drop_midpoints = []
+        
+        # The block of each type currently shown
+        self._blocks_by_type = {}
     
     def add_block(self, block_type, content=""):
         """Add a block of the specified type."""
@@ -282,13 +293,19 @@ class BlocksContainer(QWidget):
             
         # Connect signals
         block.moved.connect(self._move_block)
-        block.removed.connect(self._remove_block)
+        block.removed.connect(self.remove_block)
         
         # Add to layout before the stretch item
         self.blocks_layout.insertWidget(self.blocks_layout.count() - 1, block)
+        self._blocks_by_type[block_type] = block
+        self._reindex()
         
         return block
     
+    def get_block(self, block_type):
+        """Get the block of the specified type, or None if there is none."""
+        return self._blocks_by_type.get(block_type)
+    
     def _move_block(self, from_index, to_index):
         """Move a block from one position to another."""
         if from_index == to_index:
@@ -299,15 +316,46 @@ class BlocksContainer(QWidget):
         
         # Insert at new position
         self.blocks_layout.insertWidget(to_index, widget)
+        self._reindex()
     
-    def _remove_block(self, index):
-        """Remove a block."""
+    def remove_block(self, index):
+        """Remove the block at the given position."""
         widget = self.blocks_layout.takeAt(index).widget()
+        if self._blocks_by_type.get(widget.kind) is widget:
+            del self._blocks_by_type[widget.kind]
         widget.deleteLater()
+        self._reindex()
+    
+    def remove_block_type(self, block_type):
+        """Remove the block of the specified type, if there is one."""
+        block = self._blocks_by_type.get(block_type)
+        if block is not None:
+            self.remove_block(block._container_index)
+    
+    def clear_blocks(self):
+        """Remove all blocks."""
+        while self.blocks_layout.count() > 1:  # Keep stretch item
+            self.blocks_layout.takeAt(0).widget().deleteLater()
+        self._blocks_by_type.clear()
+    
+    def _reindex(self):
+        """Record each block's position so blocks never have to search the layout."""
+        for i in range(self.blocks_layout.count() - 1):  # Exclude stretch item
+            self.blocks_layout.itemAt(i).widget()._container_index = i
+    
+    def _block_midpoints(self):
+        """Get the vertical midpoint of each block, top to bottom."""
+        midpoints = []
+        for i in range(self.blocks_layout.count() - 1):  # Exclude stretch item
+            geometry = self.blocks_layout.itemAt(i).widget().geometry()
+            midpoints.append(geometry.y() + geometry.height() / 2)
+        return midpoints
     
     def dragEnterEvent(self, event):
         """Handle drag enter events."""
         if event.mimeData().hasText():
+            # Blocks don't move while dragging, so measure them once here
+            self._drop_midpoints = self._block_midpoints()
             event.acceptProposedAction()
     
     def dragMoveEvent(self, event):
@@ -322,29 +370,15 @@ class BlocksContainer(QWidget):
             source = event.source()
             
             # Get source index
-            source_index = self.blocks_layout.indexOf(source)
+            source_index = source._container_index
             
             # Get drop position
             pos = event.position().y()
             
-            # Determine target index
-            target_index = -1
+            # Determine target index: the first block whose midpoint is below
+            # the drop position, or the end if there is none
+            target_index = bisect.bisect_right(self._drop_midpoints, pos)
             
-            for i in range(self.blocks_layout.count() - 1):  # Exclude stretch item
-                widget = self.blocks_layout.itemAt(i).widget()
-                widget_pos = widget.pos().y()
-                widget_height = widget.height()
-                
-                if pos < widget_pos + widget_height / 2:
-                    target_index = i
-                    break
-                
-                if i == self.blocks_layout.count() - 2:  # Last widget before stretch
-                    target_index = i + 1
-            
-            if target_index == -1:
-                target_index = 0
-                
             # Move the block
             self._move_block(source_index, target_index)
             
@@ -352,18 +386,5 @@ class BlocksContainer(QWidget):
     
     def get_blocks_content(self):
         """Get the content of all blocks in order."""
-        content = {}
-        
-        for i in range(self.blocks_layout.count() - 1):  # Exclude stretch item
-            widget = self.blocks_layout.itemAt(i).widget()
-            
-            if isinstance(widget, PromptBlock):
-                content["prompt"] = widget.content
-            elif isinstance(widget, CodeBlock):
-                content["code"] = widget.content
-            elif isinstance(widget, ContextBlock):
-                content["context"] = widget.content
-            elif isinstance(widget, ReminderBlock):
-                content["reminder"] = widget.content
-        
-        return content
\ No newline at end of file
+        blocks = sorted(self._blocks_by_type.items(), key=lambda item: item[1]._container_index)
+        return {block_type: block.content for block_type, block in blocks}
\ No newline at end of file
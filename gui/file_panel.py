@@ -1,15 +1,17 @@
 # gui/file_panel.py
 import os
-from typing import Dict, List, Set, Any, Optional
+import sys
+from collections import deque
+from typing import Dict, List, Set, FrozenSet, Tuple, Any, Optional
 
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QListWidget, QListWidgetItem,
+    QWidget, QVBoxLayout, QHBoxLayout, QListView, QAbstractItemView,
     QLabel, QPushButton, QComboBox, QLineEdit, QScrollArea,
-    QCheckBox, QHeaderView, QFileDialog, QMenu, QGridLayout
+    QCheckBox, QHeaderView, QFileDialog, QMenu, QGridLayout, QApplication
 )
 from PyQt6.QtCore import (
-    Qt, QAbstractItemModel, QModelIndex, 
-    QSortFilterProxyModel, QDir, pyqtSignal
+    Qt, QAbstractListModel, QModelIndex, 
+    QSortFilterProxyModel, QDir, QTimer, QObject, QThread, pyqtSignal
 )
 from PyQt6.QtGui import (
     QIcon, QColor, QBrush, QFont
@@ -18,52 +20,182 @@ from PyQt6.QtGui import (
 from core.file_manager import FileManager
 from core.utils import format_file_size, get_file_icon_path, get_active_icon_paths
 
-class FileListItem(QListWidgetItem):
-    """Custom list item for file list."""
+# Row colors for selected files
+_CATEGORY_BACKGROUNDS = {
+    'code': QColor(255, 248, 237),  # Light orange
+    'context': QColor(240, 248, 255)  # Light blue
+}
+
+# Files handed from the loader thread to the list per batch
+LOAD_CHUNK_SIZE = 500
+
+# File icons keyed by lowercased extension, so each icon is loaded once
+_ICON_CACHE: Dict[str, QIcon] = {}
+
+def _file_icon(extension: str) -> QIcon:
+    """Get the shared icon for a file extension."""
+    icon = _ICON_CACHE.get(extension)
+    if icon is None:
+        icon = QIcon(get_file_icon_path(extension))
+        _ICON_CACHE[extension] = icon
+    return icon
+
+class FileLoaderWorker(QObject):
+    """Scans the project directory on a background thread.
+    
+    Files are emitted in chunks through chunk_ready, followed by the
+    complete list through loaded.
+    """
+    
+    chunk_ready = pyqtSignal(list)
+    loaded = pyqtSignal(list)
+    
+    def __init__(self, file_manager: FileManager):
+        super().__init__()
+        self.file_manager = file_manager
+    
+    def run(self):
+        """Collect the project files and emit them."""
+        files = self.file_manager.get_project_files()
+        for start in range(0, len(files), LOAD_CHUNK_SIZE):
+            self.chunk_ready.emit(files[start:start + LOAD_CHUNK_SIZE])
+        self.loaded.emit(files)
+
+class FileListModel(QAbstractListModel):
+    """List model over file information dictionaries.
+    
+    Files and their categories are kept in plain Python lists so filtering,
+    counting and selection lookups never go through Qt item objects.
+    """
     
-    def __init__(self, file_info: Dict[str, Any], parent=None):
-        """Initialize a file list item.
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        
+        self.files: List[Dict[str, Any]] = []
+        self.categories: List[Optional[str]] = []  # 'code', 'context' or None per file
+        self.paths_lower: List[str] = []  # Lowercased paths for searching
+        self.extensions: List[str] = []  # Interned extensions for filtering
+        self.category_rows: Dict[str, Set[int]] = {'code': set(), 'context': set()}  # Rows in each category
+    
+    def set_files(self, files: List[Dict[str, Any]]):
+        """Replace the model contents, clearing all categories.
         
         Args:
-            file_info: Dictionary with file information.
-            parent: Parent widget.
+            files: List of file information dictionaries.
         """
-        super().__init__(parent)
-        
-        self.file_info = file_info
-        self.category = None  # 'code' or 'context' or None
+        self.beginResetModel()
+        self.files = files
+        self.categories = [None] * len(files)
+        self.paths_lower = [file['path'].lower() for file in files]
+        self.extensions = [sys.intern(file['extension']) for file in files]
+        self.category_rows = {'code': set(), 'context': set()}
+        self.endResetModel()
+    
+    def append_files(self, files: List[Dict[str, Any]]):
+        """Append files to the end of the model without categories.
         
-        # Set text and tooltip
-        self.setText(file_info['path'])
-        self.setToolTip(f"{file_info['full_path']}\nSize: {format_file_size(file_info['size'])}")
+        Args:
+            files: List of file information dictionaries.
+        """
+        if not files:
+            return
         
-        # Set icon based on file extension
-        extension = file_info['extension'].lower()
-        icon_path = get_file_icon_path(extension)
-        self.setIcon(QIcon(icon_path))
+        first = len(self.files)
+        self.beginInsertRows(QModelIndex(), first, first + len(files) - 1)
+        self.files.extend(files)
+        self.categories.extend([None] * len(files))
+        self.paths_lower.extend(file['path'].lower() for file in files)
+        self.extensions.extend(sys.intern(file['extension']) for file in files)
+        self.endInsertRows()
     
-    def set_category(self, category: Optional[str]):
-        """Set the category for this file item.
+    def set_category(self, rows: List[int], category: Optional[str]) -> List[Optional[str]]:
+        """Set the category for the given rows.
         
         Args:
+            rows: Source model rows to update.
             category: 'code', 'context', or None.
+            
+        Returns:
+            The previous category of each row, in the order given.
         """
-        self.category = category
-        
-        # Update appearance based on category
-        if category == 'code':
-            self.setBackground(QColor(255, 248, 237))  # Light orange
-            self.setForeground(QColor(0, 0, 0))
-            self.setText(f"{self.file_info['path']} [CODE]")
-        elif category == 'context':
-            self.setBackground(QColor(240, 248, 255))  # Light blue
-            self.setForeground(QColor(0, 0, 0))
-            self.setText(f"{self.file_info['path']} [CONTEXT]")
-        else:
-            # Reset background and text
-            self.setBackground(QBrush())
-            self.setForeground(QColor(0, 0, 0))
-            self.setText(self.file_info['path'])
+        if not rows:
+            return []
+        
+        previous = [self.categories[row] for row in rows]
+        for row, old in zip(rows, previous):
+            if old:
+                self.category_rows[old].discard(row)
+            if category:
+                self.category_rows[category].add(row)
+            self.categories[row] = category
+        
+        self.dataChanged.emit(self.index(min(rows)), self.index(max(rows)))
+        return previous
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.files)
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        
+        file_info = self.files[index.row()]
+        category = self.categories[index.row()]
+        
+        if role == Qt.ItemDataRole.DisplayRole:
+            if category:
+                return f"{file_info['path']} [{category.upper()}]"
+            return file_info['path']
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return f"{file_info['full_path']}\nSize: {format_file_size(file_info['size'])}"
+        if role == Qt.ItemDataRole.DecorationRole:
+            # Set icon based on file extension
+            return _file_icon(file_info['extension'])
+        if role == Qt.ItemDataRole.BackgroundRole:
+            return _CATEGORY_BACKGROUNDS.get(category)
+        if role == Qt.ItemDataRole.ForegroundRole and category:
+            return QColor(0, 0, 0)
+        return None
+
+class FileFilterProxyModel(QSortFilterProxyModel):
+    """Filters the file list by search text and checked extensions."""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        
+        self._search = ""
+        self._extensions: Optional[FrozenSet[str]] = None  # None shows every extension
+    
+    def set_search(self, text: str) -> bool:
+        """Set the search text, refiltering only if it changed.
+        
+        Returns:
+            True if the filter changed.
+        """
+        text = text.lower()
+        if text == self._search:
+            return False
+        self._search = text
+        self.invalidateFilter()
+        return True
+    
+    def set_extensions(self, extensions: FrozenSet[str]):
+        self._extensions = frozenset(extensions)
+        self.invalidateFilter()
+    
+    def accepts(self, row: int) -> bool:
+        """Check whether a source row passes both the extension and search filters.
+        
+        The two filters are evaluated independently, so clearing the search
+        never leaves files hidden that the extension filter would show.
+        """
+        model = self.sourceModel()
+        if self._extensions is not None and model.extensions[row] not in self._extensions:
+            return False
+        return not self._search or self._search in model.paths_lower[row]
+    
+    def filterAcceptsRow(self, source_row, source_parent):
+        return self.accepts(source_row)
 
 class FilePanel(QWidget):
     """Panel for selecting files."""
@@ -84,6 +216,21 @@ class FilePanel(QWidget):
         self.file_manager = file_manager
         self.config = config
         
+        # Background scan in progress, if any
+        self._loader_thread: Optional[QThread] = None
+        self._loader: Optional[FileLoaderWorker] = None
+        
+        # Extension filter checkboxes, kept across reloads, and their grid cells
+        self._ext_checkboxes: Dict[str, QCheckBox] = {}
+        self._ext_positions: Dict[str, Tuple[int, int]] = {}
+        
+        # Categorized files that pass the current filters
+        self._category_counts = {'code': 0, 'context': 0}
+        
+        # Loaded chunks waiting to be inserted into the list
+        self._pending_chunks = deque()
+        self._draining = False
+        
         self._init_ui()
         self._load_files()
     
@@ -99,7 +246,13 @@ class FilePanel(QWidget):
         search_label = QLabel("Search:")
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Search files...")
-        self.search_input.textChanged.connect(self._filter_files)
+        
+        # Filter once typing pauses rather than on every keystroke
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(150)
+        self._search_timer.timeout.connect(self._filter_files)
+        self.search_input.textChanged.connect(self._search_timer.start)
         
         search_layout.addWidget(search_label)
         search_layout.addWidget(self.search_input)
@@ -137,17 +290,29 @@ class FilePanel(QWidget):
         clear_btn = QPushButton("Clear All")
         clear_btn.clicked.connect(self._clear_selection)
         
+        # Shown while the project is being scanned
+        self.loading_label = QLabel("Loading files...")
+        self.loading_label.setStyleSheet("color: gray; font-style: italic;")
+        self.loading_label.setVisible(False)
+        
         list_header.addWidget(self.code_count)
         list_header.addWidget(self.context_count)
+        list_header.addWidget(self.loading_label)
         list_header.addStretch()
         list_header.addWidget(clear_btn)
         
         layout.addLayout(list_header)
         
         # File list
-        self.file_list = QListWidget()
+        self.file_model = FileListModel(self)
+        self.file_proxy = FileFilterProxyModel(self)
+        self.file_proxy.setSourceModel(self.file_model)
+        
+        self.file_list = QListView()
+        self.file_list.setModel(self.file_proxy)
+        self.file_list.setUniformItemSizes(True)
         self.file_list.setAlternatingRowColors(True)
-        self.file_list.setSelectionMode(QListWidget.SelectionMode.ExtendedSelection)
+        self.file_list.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
         self.file_list.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.file_list.customContextMenuRequested.connect(self._show_context_menu)
         
@@ -184,23 +349,87 @@ class FilePanel(QWidget):
         self._load_files()
     
     def _load_files(self):
-        """Load files from the file manager."""
+        """Start loading files from the file manager on a background thread."""
         if not self.file_manager:
             return
-            
-        # Clear file list
-        self.file_list.clear()
         
-        # Get all files
-        files = self.file_manager.get_project_files()
+        # Results from an earlier scan still running are ignored
+        if self._loader is not None:
+            self._loader.chunk_ready.disconnect(self._on_chunk_ready)
+            self._loader.loaded.disconnect(self._on_files_loaded)
+        self._pending_chunks.clear()
+        
+        # Start from an empty list; chunks are appended as they arrive
+        self.file_model.set_files([])
+        self._category_counts = {'code': 0, 'context': 0}
+        
+        thread = QThread()
+        worker = FileLoaderWorker(self.file_manager)
+        worker.moveToThread(thread)
+        
+        thread.started.connect(worker.run)
+        worker.chunk_ready.connect(self._on_chunk_ready)
+        worker.loaded.connect(self._on_files_loaded)
+        # Quit from the worker thread itself so a blocked wait() still returns
+        worker.loaded.connect(thread.quit, Qt.ConnectionType.DirectConnection)
+        thread.finished.connect(worker.deleteLater)
+        thread.finished.connect(thread.deleteLater)
+        thread.finished.connect(lambda: self._loader_finished(thread))
+        
+        # Don't let the application exit while a scan is still running
+        QApplication.instance().aboutToQuit.connect(thread.wait)
+        
+        self._loader_thread = thread
+        self._loader = worker
+        self.loading_label.setVisible(True)
+        thread.start()
+    
+    def _loader_finished(self, thread: QThread):
+        """Drop references to a finished loader thread."""
+        QApplication.instance().aboutToQuit.disconnect(thread.wait)
+        if self._loader_thread is thread:
+            self._loader_thread = None
+            self._loader = None
+    
+    def _on_chunk_ready(self, files: List[Dict[str, Any]]):
+        """Queue a chunk of loaded files for insertion.
+        
+        Args:
+            files: List of file information dictionaries.
+        """
+        self._pending_chunks.append(files)
+        if not self._draining:
+            self._draining = True
+            QTimer.singleShot(0, self._drain_next_chunk)
+    
+    def _drain_next_chunk(self):
+        """Insert one queued chunk, leaving the rest for later event loop turns."""
+        if self._pending_chunks:
+            self.file_model.append_files(self._pending_chunks.popleft())
         
-        # Add to list
-        for file in files:
-            item = FileListItem(file)
-            self.file_list.addItem(item)
+        if self._pending_chunks:
+            QTimer.singleShot(0, self._drain_next_chunk)
+        else:
+            self._draining = False
+    
+    def _on_files_loaded(self, files: List[Dict[str, Any]]):
+        """Finish loading once the background scan completes.
         
-        # Set up file extension filters
-        self._setup_extension_filters(files)
+        The list itself is filled chunk by chunk; only the extension
+        filters and counts are rebuilt here.
+        
+        Args:
+            files: List of file information dictionaries.
+        """
+        self.loading_label.setVisible(False)
+        
+        # Rebuild the extension checkboxes with painting suspended,
+        # so the panel repaints once at the end
+        self.setUpdatesEnabled(False)
+        try:
+            self._setup_extension_filters(files)
+        finally:
+            self.setUpdatesEnabled(True)
         
         # Update status
         self._update_selection_counts()
@@ -211,70 +440,67 @@ class FilePanel(QWidget):
         Args:
             files: List of file information dictionaries.
         """
-        # Clear existing filters
-        while self.extension_layout.count():
-            item = self.extension_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-        
-        # Get unique extensions
+        # Get unique extensions (files with no extension are skipped)
         extensions = self.file_manager.get_unique_extensions(files)
         
-        # Add checkbox for each extension
-        row, col = 0, 0
-        max_cols = 4  # Number of checkboxes per row
+        # Only create and remove checkboxes for extensions that changed;
+        # the rest keep their widgets and checked state
+        for ext in self._ext_checkboxes.keys() - extensions:
+            checkbox = self._ext_checkboxes.pop(ext)
+            del self._ext_positions[ext]
+            self.extension_layout.removeWidget(checkbox)
+            checkbox.deleteLater()
         
-        for ext in sorted(extensions):
-            if not ext:
-                continue  # Skip files with no extension
-                
+        for ext in extensions - self._ext_checkboxes.keys():
             checkbox = QCheckBox(ext)
+            # Set the initial state quietly; the filter is applied once below
+            checkbox.blockSignals(True)
             checkbox.setChecked(ext in self.file_manager.core_extensions)
+            checkbox.blockSignals(False)
             checkbox.stateChanged.connect(self._apply_extension_filter)
+            self._ext_checkboxes[ext] = checkbox
+        
+        # Place checkboxes in sorted order, only touching the ones whose
+        # cell changed (new extensions and those shifted by an insert or removal)
+        max_cols = 4  # Number of checkboxes per row
+        for i, ext in enumerate(sorted(extensions)):
+            position = (i // max_cols, i % max_cols)
+            if self._ext_positions.get(ext) == position:
+                continue
             
-            self.extension_layout.addWidget(checkbox, row, col)
-            
-            col += 1
-            if col >= max_cols:
-                col = 0
-                row += 1
+            checkbox = self._ext_checkboxes[ext]
+            if ext in self._ext_positions:
+                self.extension_layout.removeWidget(checkbox)
+            self.extension_layout.addWidget(checkbox, *position)
+            self._ext_positions[ext] = position
+        
+        # Filter the list to match the checkboxes
+        self._apply_extension_filter()
     
     def _apply_extension_filter(self):
         """Apply extension filter to the file list."""
-        # Get selected extensions
-        selected_extensions = set()
-        
-        for i in range(self.extension_layout.count()):
-            widget = self.extension_layout.itemAt(i).widget()
-            if isinstance(widget, QCheckBox) and widget.isChecked():
-                selected_extensions.add(widget.text())
+        # Get selected extensions, interned to match the model's strings
+        selected_extensions = frozenset(
+            sys.intern(ext) for ext, checkbox in self._ext_checkboxes.items() if checkbox.isChecked()
+        )
         
         # Hide/show files based on extension
-        for i in range(self.file_list.count()):
-            item = self.file_list.item(i)
-            
-            if isinstance(item, FileListItem):
-                ext = item.file_info["extension"]
-                
-                if ext in selected_extensions:
-                    item.setHidden(False)
-                else:
-                    item.setHidden(True)
+        self.file_proxy.set_extensions(selected_extensions)
+        self._recount_categories()
     
     def _filter_files(self):
         """Filter files based on search text."""
-        search_text = self.search_input.text().lower()
-        
-        for i in range(self.file_list.count()):
-            item = self.file_list.item(i)
-            
-            if search_text:
-                # Only show if it matches the search text and isn't filtered by extension
-                path = item.file_info['path'].lower()
-                item.setHidden(search_text not in path or item.isHidden())
-            else:
-                # Keep extension filter
-                pass
+        # Combined with the extension filter in the proxy model; nothing
+        # to do if the search is unchanged (e.g. cleared again while empty)
+        if self.file_proxy.set_search(self.search_input.text()):
+            self._recount_categories()
+    
+    def _selected_rows(self) -> List[int]:
+        """Get the source model rows selected in the file list."""
+        return [
+            self.file_proxy.mapToSource(index).row()
+            for index in self.file_list.selectionModel().selectedIndexes()
+        ]
     
     def _show_context_menu(self, position):
         """Show context menu for file list.
@@ -285,9 +511,7 @@ class FilePanel(QWidget):
         menu = QMenu()
         
         # Get selected items
-        selected_items = self.file_list.selectedItems()
-        
-        if not selected_items:
+        if not self.file_list.selectionModel().hasSelection():
             return
         
         # Add menu actions
@@ -311,12 +535,14 @@ class FilePanel(QWidget):
         Args:
             category: 'code', 'context', or None.
         """
-        # Get selected items
-        selected_items = self.file_list.selectedItems()
-        
-        for item in selected_items:
-            if isinstance(item, FileListItem):
-                item.set_category(category)
+        # Get selected items; they are all visible, so adjust the counts directly
+        previous = self.file_model.set_category(self._selected_rows(), category)
+        counts = self._category_counts
+        for old in previous:
+            if old:
+                counts[old] -= 1
+        if category:
+            counts[category] += len(previous)
         
         # Update counts
         self._update_selection_counts()
@@ -324,30 +550,25 @@ class FilePanel(QWidget):
         # Emit signal with updated selections
         self.files_selected.emit(self.get_selected_files())
     
+    def _recount_categories(self):
+        """Recount visible categorized files after the filters change."""
+        accepts = self.file_proxy.accepts
+        self._category_counts = {
+            category: sum(1 for row in rows if accepts(row))
+            for category, rows in self.file_model.category_rows.items()
+        }
+        self._update_selection_counts()
+    
     def _update_selection_counts(self):
         """Update selection count labels."""
-        code_count = 0
-        context_count = 0
-        
-        for i in range(self.file_list.count()):
-            item = self.file_list.item(i)
-            
-            if isinstance(item, FileListItem) and not item.isHidden():
-                if item.category == 'code':
-                    code_count += 1
-                elif item.category == 'context':
-                    context_count += 1
-        
-        self.code_count.setText(f"Code: {code_count}")
-        self.context_count.setText(f"Context: {context_count}")
+        self.code_count.setText(f"Code: {self._category_counts['code']}")
+        self.context_count.setText(f"Context: {self._category_counts['context']}")
     
     def _clear_selection(self):
         """Clear all file selections."""
-        for i in range(self.file_list.count()):
-            item = self.file_list.item(i)
-            
-            if isinstance(item, FileListItem):
-                item.set_category(None)
+        category_rows = self.file_model.category_rows
+        self.file_model.set_category(sorted(category_rows['code'] | category_rows['context']), None)
+        self._category_counts = {'code': 0, 'context': 0}
         
         # Update counts
         self._update_selection_counts()
@@ -361,18 +582,10 @@ class FilePanel(QWidget):
         Returns:
             Dictionary with 'code' and 'context' lists of file information.
         """
-        selected_files = {
-            'code': [],
-            'context': []
-        }
-        
-        for i in range(self.file_list.count()):
-            item = self.file_list.item(i)
-            
-            if isinstance(item, FileListItem) and not item.isHidden():
-                if item.category == 'code':
-                    selected_files['code'].append(item.file_info)
-                elif item.category == 'context':
-                    selected_files['context'].append(item.file_info)
-        
-        return selected_files
\ No newline at end of file
+        # Only the categorized rows are visited, in list order; hidden files are left out
+        files = self.file_model.files
+        accepts = self.file_proxy.accepts
+        return {
+            category: [files[row] for row in sorted(rows) if accepts(row)]
+            for category, rows in self.file_model.category_rows.items()
+        }
\ No newline at end of file
@@ -2,6 +2,10 @@
 import os
 import sys
 import json
+import importlib
+import importlib.util
+import shutil
+import subprocess
 from typing import Dict, List, Optional
 
 from PyQt6.QtWidgets import (
@@ -9,19 +13,24 @@ from PyQt6.QtWidgets import (
     QSplitter, QTabWidget, QMessageBox, QDialog,
     QDialogButtonBox, QLabel, QLineEdit, QFormLayout,
     QComboBox, QStatusBar, QFileDialog, QProgressBar,
-    QGroupBox, QCheckBox, QSlider, QSpinBox, QFrame, QGridLayout, QPushButton, QApplication)
-from PyQt6.QtCore import Qt, QSize, QThread, pyqtSignal
+    QGroupBox, QCheckBox, QSlider, QSpinBox, QFrame, QGridLayout, QPushButton, QApplication,
+    QProgressDialog)
+from PyQt6.QtCore import Qt, QSize, QObject, QRunnable, QThreadPool, QEventLoop, pyqtSignal
 from PyQt6.QtGui import QIcon, QAction, QFont, QActionGroup
 
 from core.file_manager import FileManager
 from core.llm_service import LLMService
 from core.utils import ApiKeyManager
+from core.api_keys import get_env_file_path
 from gui.style import Style
 from gui.file_panel import FilePanel
 from gui.prompt_panel import PromptPanel
 from gui.message_panel import MessagePanel
 from gui.output_panel import OutputPanel
 
+# Echo mode of the API key field, keyed by the "show key" checkbox state
+_KEY_ECHO_MODES = {True: QLineEdit.EchoMode.Normal, False: QLineEdit.EchoMode.Password}
+
 class ApiKeyDialog(QDialog):
     """Dialog for entering API keys."""
     
@@ -44,10 +53,9 @@ class ApiKeyDialog(QDialog):
         
         # Set initial service if provided
         if service_name and available_services:
-            for i in range(self.service_combo.count()):
-                if self.service_combo.itemData(i) == service_name:
-                    self.service_combo.setCurrentIndex(i)
-                    break
+            index = self.service_combo.findData(service_name)
+            if index >= 0:
+                self.service_combo.setCurrentIndex(index)
         
         form_layout.addRow("Service:", self.service_combo)
         
@@ -61,7 +69,7 @@ class ApiKeyDialog(QDialog):
         
         # Show key checkbox
         self.show_key_check = QCheckBox("Show API Key")
-        self.show_key_check.stateChanged.connect(self._toggle_key_visibility)
+        self.show_key_check.toggled.connect(self._toggle_key_visibility)
         layout.addWidget(self.show_key_check)
         
         # Load current key
@@ -70,7 +78,7 @@ class ApiKeyDialog(QDialog):
         layout.addWidget(self.update_button)
         
         # Note about .env file
-        env_path = os.path.join(self.config["project_root"], ".env")
+        env_path = get_env_file_path(self.config)
         note_label = QLabel(f"Keys are stored in: {env_path}")
         note_label.setStyleSheet("color: gray; font-style: italic;")
         layout.addWidget(note_label)
@@ -81,12 +89,9 @@ class ApiKeyDialog(QDialog):
         button_box.rejected.connect(self.reject)
         layout.addWidget(button_box)
     
-    def _toggle_key_visibility(self, state):
+    def _toggle_key_visibility(self, checked):
         """Toggle visibility of API key."""
-        if state == Qt.CheckState.Checked:
-            self.api_key_edit.setEchoMode(QLineEdit.EchoMode.Normal)
-        else:
-            self.api_key_edit.setEchoMode(QLineEdit.EchoMode.Password)
+        self.api_key_edit.setEchoMode(_KEY_ECHO_MODES[checked])
     
     def load_current_key(self):
         """Load the current API key for the selected service."""
@@ -107,21 +112,43 @@ class ApiKeyDialog(QDialog):
         """Get the entered API key."""
         return self.api_key_edit.text()
 
-class LLMWorker(QThread):
-    """Worker thread for LLM API requests."""
+class LLMSignals(QObject):
+    """Signals emitted by an LLMRunnable."""
     
     finished = pyqtSignal(str)
     progress = pyqtSignal(int)
+
+class LLMRunnable(QRunnable):
+    """Pooled task for LLM API requests."""
     
     def __init__(self, llm_service, prompt):
         super().__init__()
         self.llm_service = llm_service
         self.prompt = prompt
+        self.signals = LLMSignals()
     
     def run(self):
         """Run the LLM request."""
-        response = self.llm_service.send_request(self.prompt, self.progress.emit)
-        self.finished.emit(response)
+        response = self.llm_service.send_request(self.prompt, self.signals.progress.emit)
+        self.signals.finished.emit(response)
+
+class TaskSignals(QObject):
+    """Signals emitted by a TaskRunnable."""
+    
+    finished = pyqtSignal(object)
+
+class TaskRunnable(QRunnable):
+    """Pooled task that runs a function off the GUI thread and emits its result."""
+    
+    def __init__(self, function, *args):
+        super().__init__()
+        self.function = function
+        self.args = args
+        self.signals = TaskSignals()
+    
+    def run(self):
+        """Run the function."""
+        self.signals.finished.emit(self.function(*self.args))
 
 class MainWindow(QMainWindow):
     """Main application window."""
@@ -152,11 +179,33 @@ class MainWindow(QMainWindow):
             )
             self._configure_api_key()
         
-        # Initialize worker thread
-        self.llm_thread = None
+        # Threads for LLM requests, reused across requests
+        self.llm_pool = QThreadPool(self)
+        self.llm_pool.setMaxThreadCount(2)
+        
+        # Model settings dialogs keyed by (provider, model ID)
+        self._model_settings_dialogs = {}
+        
+        # Provider-specific parts of the model settings dialog
+        self._settings_builders = {
+            'anthropic': self._build_anthropic_settings,
+            'openai': self._build_openai_settings,
+            'gemini': self._build_gemini_settings
+        }
+        self._settings_loaders = {
+            'anthropic': self._load_anthropic_settings,
+            'openai': self._load_openai_settings,
+            'gemini': self._load_gemini_settings
+        }
+        self._settings_savers = {
+            'anthropic': self._save_anthropic_settings,
+            'openai': self._save_openai_settings,
+            'gemini': self._save_gemini_settings
+        }
         
         # Set status bar
-        self.statusBar().showMessage(f"Project: {os.path.basename(config['project_root'])} - Ready")
+        self._project_basename = os.path.basename(config['project_root'])
+        self.statusBar().showMessage(f"Project: {self._project_basename} - Ready")
     
     def _setup_ui(self):
         """Set up the user interface."""
@@ -253,10 +302,11 @@ class MainWindow(QMainWindow):
         settings_menu.addAction(model_settings_action)
         
         # Add provider submenu
-        provider_menu = settings_menu.addMenu("API Provider")
+        self.provider_menu = settings_menu.addMenu("API Provider")
         
-        # Will populate this dynamically once LLM service is initialized
+        # Populated the first time the submenu is opened
         self.provider_actions = {}
+        self.provider_menu.aboutToShow.connect(self._populate_provider_menu)
         
         # Help menu
         help_menu = menu_bar.addMenu("Help")
@@ -267,24 +317,24 @@ class MainWindow(QMainWindow):
     
     def _connect_signals(self):
         """Connect signals between components."""
+        # Both panels live on the GUI thread, so call the slots directly
         # File panel to message panel
-        self.file_panel.files_selected.connect(self.message_panel.update_files)
+        self.file_panel.files_selected.connect(self.message_panel.update_files, Qt.ConnectionType.DirectConnection)
         
         # Prompt panel to message panel
-        self.prompt_panel.prompt_selected.connect(self.message_panel.set_prompt)
+        self.prompt_panel.prompt_selected.connect(self.message_panel.set_prompt, Qt.ConnectionType.DirectConnection)
     
     def _populate_provider_menu(self):
         """Populate the provider submenu."""
         if not hasattr(self, 'llm_service'):
             return
-            
-        # Get parent menu
-        settings_menu = self.menuBar().actions()[1].menu()
-        provider_menu = settings_menu.actions()[2].menu()
         
-        # Clear existing actions
-        provider_menu.clear()
-        self.provider_actions = {}
+        # Already built; just make sure the current provider is the checked one
+        if self.provider_actions:
+            action = self.provider_actions.get(self.llm_service.api_provider)
+            if action:
+                action.setChecked(True)
+            return
         
         # Add provider actions
         providers = self.llm_service.get_available_providers()
@@ -300,7 +350,7 @@ class MainWindow(QMainWindow):
             action.triggered.connect(lambda checked, p=provider: self._set_provider(p))
             
             provider_group.addAction(action)
-            provider_menu.addAction(action)
+            self.provider_menu.addAction(action)
             self.provider_actions[provider] = action
     
     def _select_project(self):
@@ -323,7 +373,8 @@ class MainWindow(QMainWindow):
             self.output_panel.set_file_manager(self.file_manager)
             
             # Update status bar
-            self.statusBar().showMessage(f"Project: {os.path.basename(directory)} - Ready")
+            self._project_basename = os.path.basename(directory)
+            self.statusBar().showMessage(f"Project: {self._project_basename} - Ready")
     
     def _configure_api_key(self):
         """Configure API key."""
@@ -364,19 +415,67 @@ class MainWindow(QMainWindow):
             self._configure_api_key()
             return
         
+        # The dialog only depends on the provider and model, so build it once
+        # per pair and refresh its values from the service on each show
+        key = (self.llm_service.api_provider, self.llm_service.model_id)
+        dialog = self._model_settings_dialogs.get(key)
+        if dialog is None:
+            dialog = self._build_model_settings_dialog()
+            self._model_settings_dialogs[key] = dialog
+        
+        provider = self.llm_service.api_provider
+        controls = dialog.controls
+        
+        # Snapshot the current settings once
+        parameters = self.llm_service.parameters
+        max_tokens_key = "max_output_tokens" if provider == "gemini" else "max_tokens"
+        settings = {
+            'use_extended_thinking': getattr(self.llm_service, 'use_extended_thinking', False),
+            'extended_thinking_budget': getattr(self.llm_service, 'extended_thinking_budget', 16000),
+            'reasoning_effort': getattr(self.llm_service, 'reasoning_effort', 'medium'),
+            'use_thinking': getattr(self.llm_service, 'use_thinking', False),
+            'max_tokens': parameters.get(max_tokens_key, 4000),
+            'temperature': parameters.get("temperature", 0.7)
+        }
+        
+        # Load current settings; the controls present follow the model's capabilities
+        loader = self._settings_loaders.get(provider)
+        if loader:
+            loader(controls, settings)
+        
+        controls["max_tokens_input"].setValue(settings['max_tokens'])
+        controls["temp_slider"].setValue(int(settings['temperature'] * 100))
+        
+        # Show dialog
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            # Save settings based on provider
+            saver = self._settings_savers.get(provider)
+            if saver:
+                saver(controls)
+            
+            # Common settings
+            self.llm_service.set_parameter(max_tokens_key, controls["max_tokens_input"].value())
+            
+            self.llm_service.set_parameter("temperature", controls["temp_slider"].value() / 100)
+            
+            self.statusBar().showMessage(f"Model settings updated")
+    
+    def _build_model_settings_dialog(self):
+        """Build the model settings dialog for the current provider and model.
+        
+        Returns:
+            QDialog with a controls attribute mapping names to input widgets.
+        """
         dialog = QDialog(self)
         dialog.setWindowTitle("Model Settings")
         dialog.setMinimumWidth(400)
         
         layout = QVBoxLayout(dialog)
+        controls = {}
         
         # Get model info
         model_caps = self.llm_service._get_model_capabilities()
-        model_name = "Unknown Model"
-        for model in self.llm_service.api_config.get("models", []):
-            if model.get("id") == self.llm_service.model_id:
-                model_name = model.get("name", "Unknown Model")
-                break
+        model_name = self.llm_service.get_model_name()
         
         # Model information header
         info_layout = QGridLayout()
@@ -408,82 +507,11 @@ class MainWindow(QMainWindow):
         layout.addWidget(separator)
         
         # Provider-specific settings
-        if self.llm_service.api_provider == "anthropic":
-            # Extended thinking settings (only if supported)
-            if model_caps.get("supports_extended_thinking", False):
-                thinking_group = QGroupBox("Extended Thinking")
-                thinking_layout = QVBoxLayout()
-                
-                thinking_check = QCheckBox("Enable Extended Thinking")
-                thinking_check.setChecked(getattr(self.llm_service, 'use_extended_thinking', False))
-                thinking_layout.addWidget(thinking_check)
-                
-                # Budget slider
-                budget_layout = QHBoxLayout()
-                budget_layout.addWidget(QLabel("Token Budget:"))
-                
-                budget_slider = QSlider(Qt.Orientation.Horizontal)
-                budget_slider.setMinimum(4000)
-                budget_slider.setMaximum(int(model_caps.get("max_tokens_extended", 64000)))
-                budget_slider.setValue(getattr(self.llm_service, 'extended_thinking_budget', 16000))
-                budget_slider.setTickPosition(QSlider.TickPosition.TicksBelow)
-                budget_slider.setTickInterval(10000)
-                
-                budget_label = QLabel(f"{budget_slider.value():,}")
-                budget_slider.valueChanged.connect(lambda v: budget_label.setText(f"{v:,}"))
-                
-                budget_layout.addWidget(budget_slider)
-                budget_layout.addWidget(budget_label)
-                
-                thinking_layout.addLayout(budget_layout)
-                thinking_layout.addWidget(QLabel("Extended thinking enables Claude to reason more thoroughly."))
-                
-                thinking_group.setLayout(thinking_layout)
-                layout.addWidget(thinking_group)
-        
-        elif self.llm_service.api_provider == "openai":
-            # Reasoning settings (only if supported)
-            if model_caps.get("supports_reasoning", False):
-                reasoning_group = QGroupBox("Reasoning Settings")
-                reasoning_layout = QVBoxLayout()
-                
-                # Reasoning effort
-                effort_layout = QHBoxLayout()
-                effort_layout.addWidget(QLabel("Reasoning Effort:"))
-                
-                effort_combo = QComboBox()
-                effort_combo.addItems(["low", "medium", "high"])
-                
-                # Set current value
-                current_effort = getattr(self.llm_service, 'reasoning_effort', 'medium')
-                index = effort_combo.findText(current_effort)
-                if index >= 0:
-                    effort_combo.setCurrentIndex(index)
-                
-                effort_layout.addWidget(effort_combo)
-                reasoning_layout.addLayout(effort_layout)
-                
-                reasoning_layout.addWidget(QLabel("Low: Faster responses with less thinking"))
-                reasoning_layout.addWidget(QLabel("Medium: Balanced approach (default)"))
-                reasoning_layout.addWidget(QLabel("High: More thorough thinking, more tokens used"))
-                
-                reasoning_group.setLayout(reasoning_layout)
-                layout.addWidget(reasoning_group)
-        
-        elif self.llm_service.api_provider == "gemini":
-            # Thinking settings (only if supported)
-            if model_caps.get("supports_thinking", False):
-                thinking_group = QGroupBox("Thinking")
-                thinking_layout = QVBoxLayout()
-                
-                thinking_check = QCheckBox("Enable Thinking")
-                thinking_check.setChecked(getattr(self.llm_service, 'use_thinking', False))
-                thinking_layout.addWidget(thinking_check)
-                
-                thinking_layout.addWidget(QLabel("Thinking enables Gemini to reason through complex problems step by step."))
-                
-                thinking_group.setLayout(thinking_layout)
-                layout.addWidget(thinking_group)
+        builder = self._settings_builders.get(self.llm_service.api_provider)
+        max_tokens_limit = 100000  # Default high maximum
+        if builder:
+            provider_controls, max_tokens_limit = builder(layout, model_caps)
+            controls.update(provider_controls)
         
         # Common settings for all models
         output_group = QGroupBox("Output Settings")
@@ -495,28 +523,7 @@ class MainWindow(QMainWindow):
         
         max_tokens_input = QSpinBox()
         max_tokens_input.setMinimum(100)
-        max_tokens_input.setMaximum(100000)  # Default high maximum
-        
-        # Set maximum based on model capabilities
-        if self.llm_service.api_provider == "anthropic":
-            if model_caps.get("supports_long_output", False):
-                max_tokens_input.setMaximum(int(model_caps.get("max_output_tokens", 128000)))
-            else:
-                max_tokens_input.setMaximum(int(model_caps.get("max_tokens_default", 8192)))
-        elif self.llm_service.api_provider == "openai":
-            if model_caps.get("supports_reasoning", False):
-                max_tokens_input.setMaximum(int(model_caps.get("max_completion_tokens", 100000)))
-            else:
-                max_tokens_input.setMaximum(int(model_caps.get("max_tokens_default", 16384)))
-        elif self.llm_service.api_provider == "gemini":
-            max_tokens_input.setMaximum(int(model_caps.get("output_token_limit", 8192)))
-        
-        # Set current value based on provider
-        if self.llm_service.api_provider == "gemini":
-            max_tokens_input.setValue(self.llm_service.parameters.get("max_output_tokens", 4000))
-        else:
-            max_tokens_input.setValue(self.llm_service.parameters.get("max_tokens", 4000))
-        
+        max_tokens_input.setMaximum(max_tokens_limit)
         max_tokens_input.setSingleStep(1000)
         
         tokens_layout.addWidget(max_tokens_input)
@@ -529,12 +536,12 @@ class MainWindow(QMainWindow):
         temp_slider = QSlider(Qt.Orientation.Horizontal)
         temp_slider.setMinimum(0)
         temp_slider.setMaximum(200)  # 0-2 range (will divide by 100)
-        temp_slider.setValue(int(self.llm_service.parameters.get("temperature", 0.7) * 100))
         temp_slider.setTickPosition(QSlider.TickPosition.TicksBelow)
         temp_slider.setTickInterval(25)
         
         temp_value = QLabel(f"{temp_slider.value() / 100:.2f}")
-        temp_slider.valueChanged.connect(lambda v: temp_value.setText(f"{v / 100:.2f}"))
+        set_temp_text = temp_value.setText
+        temp_slider.valueChanged.connect(lambda v: set_temp_text(f"{v / 100:.2f}"))
         
         temp_layout.addWidget(temp_slider)
         temp_layout.addWidget(temp_value)
@@ -543,75 +550,261 @@ class MainWindow(QMainWindow):
         output_group.setLayout(output_layout)
         layout.addWidget(output_group)
         
+        controls["max_tokens_input"] = max_tokens_input
+        controls["temp_slider"] = temp_slider
+        
         # Buttons
         button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Save | QDialogButtonBox.StandardButton.Cancel)
         button_box.accepted.connect(dialog.accept)
         button_box.rejected.connect(dialog.reject)
         layout.addWidget(button_box)
         
-        # Show dialog
-        if dialog.exec() == QDialog.DialogCode.Accepted:
-            # Save settings based on provider
-            if self.llm_service.api_provider == "anthropic":
-                if model_caps.get("supports_extended_thinking", False):
-                    self.llm_service.set_extended_thinking(
-                        thinking_check.isChecked(),
-                        budget_slider.value()
-                    )
+        dialog.controls = controls
+        return dialog
+    
+    def _build_anthropic_settings(self, layout, model_caps):
+        """Add the Anthropic settings to the model settings dialog.
+        
+        Args:
+            layout: Dialog layout to add the settings group to
+            model_caps: Capabilities of the current model
             
-            elif self.llm_service.api_provider == "openai":
-                if model_caps.get("supports_reasoning", False):
-                    self.llm_service.set_reasoning_effort(effort_combo.currentText())
+        Returns:
+            Tuple of the controls dict and the max tokens limit for the model
+        """
+        controls = {}
+        
+        # Extended thinking settings (only if supported)
+        if model_caps.get("supports_extended_thinking", False):
+            thinking_group = QGroupBox("Extended Thinking")
+            thinking_layout = QVBoxLayout()
             
-            elif self.llm_service.api_provider == "gemini":
-                if model_caps.get("supports_thinking", False):
-                    self.llm_service.set_thinking(thinking_check.isChecked())
+            thinking_check = QCheckBox("Enable Extended Thinking")
+            thinking_layout.addWidget(thinking_check)
             
-            # Common settings
-            if self.llm_service.api_provider == "gemini":
-                self.llm_service.set_parameter("max_output_tokens", max_tokens_input.value())
-            else:
-                self.llm_service.set_parameter("max_tokens", max_tokens_input.value())
+            # Budget slider
+            budget_layout = QHBoxLayout()
+            budget_layout.addWidget(QLabel("Token Budget:"))
             
-            self.llm_service.set_parameter("temperature", temp_slider.value() / 100)
+            budget_slider = QSlider(Qt.Orientation.Horizontal)
+            budget_slider.setMinimum(4000)
+            budget_slider.setMaximum(int(model_caps.get("max_tokens_extended", 64000)))
+            budget_slider.setTickPosition(QSlider.TickPosition.TicksBelow)
+            budget_slider.setTickInterval(10000)
             
-            self.statusBar().showMessage(f"Model settings updated")
+            budget_label = QLabel(f"{budget_slider.value():,}")
+            set_budget_text = budget_label.setText
+            budget_slider.valueChanged.connect(lambda v: set_budget_text(f"{v:,}"))
+            
+            budget_layout.addWidget(budget_slider)
+            budget_layout.addWidget(budget_label)
+            
+            thinking_layout.addLayout(budget_layout)
+            thinking_layout.addWidget(QLabel("Extended thinking enables Claude to reason more thoroughly."))
+            
+            thinking_group.setLayout(thinking_layout)
+            layout.addWidget(thinking_group)
+            
+            controls["thinking_check"] = thinking_check
+            controls["budget_slider"] = budget_slider
+        
+        if model_caps.get("supports_long_output", False):
+            max_tokens_limit = int(model_caps.get("max_output_tokens", 128000))
+        else:
+            max_tokens_limit = int(model_caps.get("max_tokens_default", 8192))
+        
+        return controls, max_tokens_limit
+    
+    def _build_openai_settings(self, layout, model_caps):
+        """Add the OpenAI settings to the model settings dialog.
+        
+        Args:
+            layout: Dialog layout to add the settings group to
+            model_caps: Capabilities of the current model
+            
+        Returns:
+            Tuple of the controls dict and the max tokens limit for the model
+        """
+        controls = {}
+        
+        # Reasoning settings (only if supported)
+        if model_caps.get("supports_reasoning", False):
+            reasoning_group = QGroupBox("Reasoning Settings")
+            reasoning_layout = QVBoxLayout()
+            
+            # Reasoning effort
+            effort_layout = QHBoxLayout()
+            effort_layout.addWidget(QLabel("Reasoning Effort:"))
+            
+            effort_combo = QComboBox()
+            effort_combo.addItems(["low", "medium", "high"])
+            
+            effort_layout.addWidget(effort_combo)
+            reasoning_layout.addLayout(effort_layout)
+            
+            reasoning_layout.addWidget(QLabel("Low: Faster responses with less thinking"))
+            reasoning_layout.addWidget(QLabel("Medium: Balanced approach (default)"))
+            reasoning_layout.addWidget(QLabel("High: More thorough thinking, more tokens used"))
+            
+            reasoning_group.setLayout(reasoning_layout)
+            layout.addWidget(reasoning_group)
+            
+            controls["effort_combo"] = effort_combo
+            max_tokens_limit = int(model_caps.get("max_completion_tokens", 100000))
+        else:
+            max_tokens_limit = int(model_caps.get("max_tokens_default", 16384))
+        
+        return controls, max_tokens_limit
+    
+    def _build_gemini_settings(self, layout, model_caps):
+        """Add the Gemini settings to the model settings dialog.
+        
+        Args:
+            layout: Dialog layout to add the settings group to
+            model_caps: Capabilities of the current model
+            
+        Returns:
+            Tuple of the controls dict and the max tokens limit for the model
+        """
+        controls = {}
+        
+        # Thinking settings (only if supported)
+        if model_caps.get("supports_thinking", False):
+            thinking_group = QGroupBox("Thinking")
+            thinking_layout = QVBoxLayout()
+            
+            thinking_check = QCheckBox("Enable Thinking")
+            thinking_layout.addWidget(thinking_check)
+            
+            thinking_layout.addWidget(QLabel("Thinking enables Gemini to reason through complex problems step by step."))
+            
+            thinking_group.setLayout(thinking_layout)
+            layout.addWidget(thinking_group)
+            
+            controls["thinking_check"] = thinking_check
+        
+        return controls, int(model_caps.get("output_token_limit", 8192))
+    
+    def _load_anthropic_settings(self, controls, settings):
+        """Show the current Anthropic settings in the dialog controls."""
+        if "thinking_check" in controls:
+            controls["thinking_check"].setChecked(settings['use_extended_thinking'])
+            controls["budget_slider"].setValue(settings['extended_thinking_budget'])
+    
+    def _load_openai_settings(self, controls, settings):
+        """Show the current OpenAI settings in the dialog controls."""
+        if "effort_combo" in controls:
+            index = controls["effort_combo"].findText(settings['reasoning_effort'])
+            if index >= 0:
+                controls["effort_combo"].setCurrentIndex(index)
+    
+    def _load_gemini_settings(self, controls, settings):
+        """Show the current Gemini settings in the dialog controls."""
+        if "thinking_check" in controls:
+            controls["thinking_check"].setChecked(settings['use_thinking'])
+    
+    def _save_anthropic_settings(self, controls):
+        """Apply the Anthropic settings from the dialog controls."""
+        if "thinking_check" in controls:
+            self.llm_service.set_extended_thinking(
+                controls["thinking_check"].isChecked(),
+                controls["budget_slider"].value()
+            )
+    
+    def _save_openai_settings(self, controls):
+        """Apply the OpenAI settings from the dialog controls."""
+        if "effort_combo" in controls:
+            self.llm_service.set_reasoning_effort(controls["effort_combo"].currentText())
+    
+    def _save_gemini_settings(self, controls):
+        """Apply the Gemini settings from the dialog controls."""
+        if "thinking_check" in controls:
+            self.llm_service.set_thinking(controls["thinking_check"].isChecked())
     
     def _check_gemini_dependencies(self):
         """Check if Gemini dependencies are installed."""
+        # Only locate the package; importing it is left to the LLM service
         try:
-            import google.generativeai
-            return True
+            installed = importlib.util.find_spec("google.generativeai") is not None
         except ImportError:
-            result = QMessageBox.question(
+            installed = False  # The google namespace package itself is missing
+        
+        if installed:
+            return True
+        
+        result = QMessageBox.question(
+            self,
+            "Missing Dependencies",
+            "The Google Generative AI package is required for Gemini models.\n"
+            "Would you like to install it now?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.Yes
+        )
+        
+        if result == QMessageBox.StandardButton.Yes:
+            error = self._install_package("google-generativeai")
+            if error is None:
+                importlib.invalidate_caches()
+                QMessageBox.information(
+                    self,
+                    "Success",
+                    "google-generativeai has been installed successfully."
+                )
+                return True
+            
+            QMessageBox.critical(
                 self,
-                "Missing Dependencies",
-                "The Google Generative AI package is required for Gemini models.\n"
-                "Would you like to install it now?",
-                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-                QMessageBox.StandardButton.Yes
+                "Installation Failed",
+                f"Failed to install dependencies: {error}\n\n"
+                "Please try installing manually with:\n"
+                "pip install google-generativeai"
             )
+        return False
+    
+    def _install_package(self, package):
+        """Install a package into the running interpreter without blocking the GUI.
+        
+        Args:
+            package: Name of the package to install
             
-            if result == QMessageBox.StandardButton.Yes:
-                try:
-                    import subprocess
-                    subprocess.check_call([sys.executable, "-m", "pip", "install", "google-generativeai"])
-                    QMessageBox.information(
-                        self,
-                        "Success",
-                        "google-generativeai has been installed successfully."
-                    )
-                    return True
-                except Exception as e:
-                    QMessageBox.critical(
-                        self,
-                        "Installation Failed",
-                        f"Failed to install dependencies: {str(e)}\n\n"
-                        "Please try installing manually with:\n"
-                        "pip install google-generativeai"
-                    )
-                    return False
-            return False
+        Returns:
+            None on success, otherwise the error message
+        """
+        # uv resolves much faster than pip; use it when it is on PATH
+        uv_path = shutil.which("uv")
+        if uv_path:
+            command = [uv_path, "pip", "install", "--quiet", "--python", sys.executable, package]
+        else:
+            command = [sys.executable, "-m", "pip", "install", "--no-input", "--quiet", package]
+        
+        def install():
+            try:
+                subprocess.check_call(command, stdin=subprocess.DEVNULL)
+            except Exception as e:
+                return str(e)
+            return None
+        
+        progress = QProgressDialog(f"Installing {package}...", None, 0, 0, self)
+        progress.setWindowTitle("Installing Dependencies")
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(0)
+        progress.show()
+        
+        # Keep the GUI responsive while the install runs on the pool
+        loop = QEventLoop()
+        outcome = {}
+        
+        def finished(error):
+            outcome['error'] = error
+            loop.quit()
+        
+        task = TaskRunnable(install)
+        task.signals.finished.connect(finished, Qt.ConnectionType.QueuedConnection)
+        self.llm_pool.start(task)
+        loop.exec()
+        
+        progress.close()
+        return outcome['error']
     
     def _set_provider(self, provider):
         """Set the current API provider."""
@@ -666,11 +859,12 @@ class MainWindow(QMainWindow):
         self.progress_bar.setVisible(True)
         self.statusBar().showMessage("Sending request to AI...")
         
-        # Run in thread
-        self.llm_thread = LLMWorker(self.llm_service, message)
-        self.llm_thread.progress.connect(self.progress_bar.setValue)
-        self.llm_thread.finished.connect(self._handle_llm_response)
-        self.llm_thread.start()
+        # Run on the worker pool
+        runnable = LLMRunnable(self.llm_service, message)
+        # Emitted from a pool thread, always delivered on the GUI thread
+        runnable.signals.progress.connect(self.progress_bar.setValue, Qt.ConnectionType.QueuedConnection)
+        runnable.signals.finished.connect(self._handle_llm_response, Qt.ConnectionType.QueuedConnection)
+        self.llm_pool.start(runnable)
     
     def _handle_llm_response(self, response):
         """Handle LLM response."""
@@ -681,22 +875,32 @@ class MainWindow(QMainWindow):
         # Show response
         self.output_panel.set_response(response)
         
-        # Format and save output
+        # Read everything the output needs from the widgets here, then
+        # format and save it on the pool so large outputs don't stall the UI
         output_options = self.output_panel.get_output_options()
+        template = self.output_panel.format_edit.toPlainText()
         assembled_message = self.message_panel.get_assembled_message(substitute_files=False)
         files = self.file_panel.get_selected_files()
+        file_manager = self.file_manager
+        
+        def format_and_save():
+            # Written to the file piece by piece as it is formatted
+            output_chunks = self.output_panel.iter_format_output(
+                response, 
+                assembled_message,
+                files.get('code', []),
+                files.get('context', []),
+                output_options,
+                template
+            )
+            return file_manager.save_output(output_chunks, "ai_analysis")
         
-        output_content = self.output_panel.format_output(
-            response, 
-            assembled_message,
-            files.get('code', []),
-            files.get('context', []),
-            output_options
-        )
-        
-        # Save output
-        output_path = self.file_manager.save_output(output_content, "ai_analysis")
-        
+        task = TaskRunnable(format_and_save)
+        task.signals.finished.connect(self._handle_output_saved, Qt.ConnectionType.QueuedConnection)
+        self.llm_pool.start(task)
+    
+    def _handle_output_saved(self, output_path):
+        """Report where the AI response output was saved."""
         if output_path:
             self.statusBar().showMessage(f"Response saved to {output_path}")
             
@@ -718,21 +922,32 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Warning", "No files selected.")
             return
             
-        # Format output without AI response
+        # Format output without AI response; like AI output, the formatting
+        # and the write run on the pool so large dumps don't stall the UI
         output_options = self.output_panel.get_output_options()
+        template = self.output_panel.format_edit.toPlainText()
         assembled_message = self.message_panel.get_assembled_message(substitute_files=False)
+        file_manager = self.file_manager
+        
+        def format_and_save():
+            # Written to the file piece by piece as it is formatted
+            output_chunks = self.output_panel.iter_format_output(
+                "", 
+                assembled_message,
+                files.get('code', []),
+                files.get('context', []),
+                output_options,
+                template
+            )
+            return file_manager.save_output(output_chunks, "code_combine")
         
-        output_content = self.output_panel.format_output(
-            "", 
-            assembled_message,
-            files.get('code', []),
-            files.get('context', []),
-            output_options
-        )
-        
-        # Save output
-        output_path = self.file_manager.save_output(output_content, "code_combine")
-        
+        self.statusBar().showMessage("Combining code...")
+        task = TaskRunnable(format_and_save)
+        task.signals.finished.connect(self._handle_combine_saved, Qt.ConnectionType.QueuedConnection)
+        self.llm_pool.start(task)
+    
+    def _handle_combine_saved(self, output_path):
+        """Report where the combined code was saved."""
         if output_path:
             self.statusBar().showMessage(f"Code combined and saved to {output_path}")
             
@@ -753,10 +968,8 @@ class MainWindow(QMainWindow):
             "AI Helper v1.0\n\nA tool for analyzing code projects with AI assistance.\n\nBuilt with PyQt6."
         )
     
-    def showEvent(self, event):
-        """Handle window show event."""
-        super().showEvent(event)
-        
-        # Populate provider menu after service is initialized
-        if hasattr(self, 'llm_service'):
-            self._populate_provider_menu()
\ No newline at end of file
+    def closeEvent(self, event):
+        """Handle window close event."""
+        # Give a request in flight a chance to finish before shutting down
+        self.llm_pool.waitForDone(5000)
+        super().closeEvent(event)
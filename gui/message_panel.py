@@ -6,7 +6,7 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QFont
 
-from gui.blocks import BlocksContainer, PromptBlock, CodeBlock, ContextBlock, ReminderBlock
+from gui.blocks import BlocksContainer
 
 class MessagePanel(QWidget):
     """Panel for constructing messages."""
@@ -89,32 +89,23 @@ class MessagePanel(QWidget):
         # Update prompt block
         if hasattr(self, 'prompt_block'):
             self.prompt_block.content = prompt_data.get('prompt', '')
-            self.prompt_block.content_widget.setText(prompt_data.get('prompt', ''))
+            self.prompt_block.content_widget.setPlainText(prompt_data.get('prompt', ''))
         
         # Add or update reminder block if needed
         reminder_text = prompt_data.get('reminder', '')
         
         if reminder_text:
             # Check if reminder block exists
-            reminder_block = None
-            for i in range(self.blocks_container.blocks_layout.count() - 1):
-                widget = self.blocks_container.blocks_layout.itemAt(i).widget()
-                if isinstance(widget, ReminderBlock):
-                    reminder_block = widget
-                    break
+            reminder_block = self.blocks_container.get_block('reminder')
                     
             if reminder_block:
                 reminder_block.content = reminder_text
-                reminder_block.content_widget.setText(reminder_text)
+                reminder_block.content_widget.setPlainText(reminder_text)
             else:
                 self.blocks_container.add_block("reminder", reminder_text)
         else:
             # Remove reminder block if it exists
-            for i in range(self.blocks_container.blocks_layout.count() - 1):
-                widget = self.blocks_container.blocks_layout.itemAt(i).widget()
-                if isinstance(widget, ReminderBlock):
-                    self.blocks_container.blocks_layout.takeAt(i).widget().deleteLater()
-                    break
+            self.blocks_container.remove_block_type('reminder')
     
     def update_files(self, selected_files):
         self.selected_files = selected_files
@@ -130,25 +121,16 @@ class MessagePanel(QWidget):
                 code_content += f"\n- {file['path']}"
                 
             # Check if code block exists
-            code_block = None
-            for i in range(self.blocks_container.blocks_layout.count() - 1):
-                widget = self.blocks_container.blocks_layout.itemAt(i).widget()
-                if isinstance(widget, CodeBlock):
-                    code_block = widget
-                    break
+            code_block = self.blocks_container.get_block('code')
                     
             if code_block:
                 code_block.content = code_content
-                code_block.content_widget.setText(code_content)
+                code_block.content_widget.setPlainText(code_content)
             else:
                 self.blocks_container.add_block("code", code_content)
         else:
             # Remove code block if it exists
-            for i in range(self.blocks_container.blocks_layout.count() - 1):
-                widget = self.blocks_container.blocks_layout.itemAt(i).widget()
-                if isinstance(widget, CodeBlock):
-                    self.blocks_container.blocks_layout.takeAt(i).widget().deleteLater()
-                    break
+            self.blocks_container.remove_block_type('code')
         
         # Update or add context block
         if has_context:
@@ -157,25 +139,16 @@ class MessagePanel(QWidget):
                 context_content += f"\n- {file['path']}"
                 
             # Check if context block exists
-            context_block = None
-            for i in range(self.blocks_container.blocks_layout.count() - 1):
-                widget = self.blocks_container.blocks_layout.itemAt(i).widget()
-                if isinstance(widget, ContextBlock):
-                    context_block = widget
-                    break
+            context_block = self.blocks_container.get_block('context')
                     
             if context_block:
                 context_block.content = context_content
-                context_block.content_widget.setText(context_content)
+                context_block.content_widget.setPlainText(context_content)
             else:
                 self.blocks_container.add_block("context", context_content)
         else:
             # Remove context block if it exists
-            for i in range(self.blocks_container.blocks_layout.count() - 1):
-                widget = self.blocks_container.blocks_layout.itemAt(i).widget()
-                if isinstance(widget, ContextBlock):
-                    self.blocks_container.blocks_layout.takeAt(i).widget().deleteLater()
-                    break
+            self.blocks_container.remove_block_type('context')
     
     def _preview_message(self):
         """Preview the assembled message."""
@@ -189,9 +162,7 @@ class MessagePanel(QWidget):
     def _reset_blocks(self):
         """Reset blocks to default order."""
         # Clear all blocks
-        while self.blocks_container.blocks_layout.count() > 1:  # Keep stretch item
-            widget = self.blocks_container.blocks_layout.takeAt(0).widget()
-            widget.deleteLater()
+        self.blocks_container.clear_blocks()
         
         # Add blocks in default order
         self.prompt_block = self.blocks_container.add_block("prompt", self.prompt_data.get('prompt', ''))
@@ -223,28 +194,15 @@ class MessagePanel(QWidget):
         
         for i in range(self.blocks_container.blocks_layout.count() - 1):  # Exclude stretch item
             widget = self.blocks_container.blocks_layout.itemAt(i).widget()
+            kind = widget.kind
             
-            if isinstance(widget, PromptBlock):
-                blocks_content += f"######## PROMPT ########\n//// PROMPT – START ////\n{widget.content}\n//// PROMPT – END ////\n\n"
-            elif isinstance(widget, CodeBlock):
-                if substitute_files and self.selected_files.get('code', []):
-                    # Use placeholder text for preview or real file content for sending
-                    if not substitute_files:
-                        blocks_content += f"######## CODE ########\n//// CODE – START ////\n{widget.content}\n//// CODE – END ////\n\n"
-                    else:
-                        blocks_content += f"######## CODE ########\n//// CODE – START ////\n{{code}}\n//// CODE – END ////\n\n"
-                else:
-                    blocks_content += f"######## CODE ########\n//// CODE – START ////\n{widget.content}\n//// CODE – END ////\n\n"
-            elif isinstance(widget, ContextBlock):
-                if substitute_files and self.selected_files.get('context', []):
-                    # Use placeholder text for preview or real file content for sending
-                    if not substitute_files:
-                        blocks_content += f"######## CONTEXT ########\n//// CONTEXT – START ////\n{widget.content}\n//// CONTEXT – END ////\n\n"
-                    else:
-                        blocks_content += f"######## CONTEXT ########\n//// CONTEXT – START ////\n{{context}}\n//// CONTEXT – END ////\n\n"
-                else:
-                    blocks_content += f"######## CONTEXT ########\n//// CONTEXT – START ////\n{widget.content}\n//// CONTEXT – END ////\n\n"
-            elif isinstance(widget, ReminderBlock):
-                blocks_content += f"######## REMINDER ########\n//// REMINDER – START ////\n{widget.content}\n//// REMINDER – END ////\n\n"
+            # File blocks become {code}/{context} placeholders when sending,
+            # so the real file content can be substituted later
+            content = widget.content
+            if substitute_files and kind in ('code', 'context') and self.selected_files.get(kind, []):
+                content = f"{{{kind}}}"
+            
+            label = kind.upper()
+            blocks_content += f"######## {label} ########\n//// {label} – START ////\n{content}\n//// {label} – END ////\n\n"
         
         return blocks_content.strip()
\ No newline at end of file
@@ -10,6 +10,10 @@ from PyQt6.QtGui import QFont
 import os
 import re
 
+# Output template placeholders, matched case-insensitively
+_PLACEHOLDER_RE = re.compile(r"\{(prompt|response|code|context|reminder)\}", re.IGNORECASE)
+_REMINDER_RE = re.compile(r"######## REMINDER ########\n//// REMINDER – START ////\n(.*?)\n//// REMINDER – END ////", re.DOTALL)
+
 class OutputPanel(QWidget):
     """Panel for output configuration and preview."""
     
@@ -164,57 +168,58 @@ class OutputPanel(QWidget):
             "include_reminder": self.include_reminder_check.isChecked()
         }
     
-    def format_output(self, response, prompt, code_files, context_files, options=None):
-        """Format the output based on the template and options."""
+    def format_output(self, response, prompt, code_files, context_files, options=None, template=None):
+        """Format the output based on the template and options.
+        
+        Pass options and template read beforehand to call this off the GUI thread.
+        """
+        return "".join(self.iter_format_output(response, prompt, code_files, context_files, options, template))
+    
+    def iter_format_output(self, response, prompt, code_files, context_files, options=None, template=None):
+        """Yield the formatted output piece by piece.
+        
+        The template is scanned once and compiled files are yielded as they
+        are produced, so the output can be written out without building it
+        in memory first. Takes the same arguments as format_output.
+        """
         if options is None:
             options = self.get_output_options()
             
         # Get template
-        template = self.format_edit.toPlainText()
-        
-        # Prepare data
-        data = {}
-        
-        if options.get("include_prompt", True):
-            data["prompt"] = f"//// PROMPT – START ////\n{prompt}\n//// PROMPT – END ////"
-        else:
-            data["prompt"] = ""
-            
-        if options.get("include_response", True):
-            data["response"] = f"//// RESPONSE – START ////\n{response}\n//// RESPONSE – END ////"
-        else:
-            data["response"] = ""
-            
-        if options.get("include_code", True) and code_files:
-            code_content = self.file_manager.compile_files(code_files)
-            data["code"] = f"//// CODE – START ////\n{code_content}\n//// CODE – END ////"
-        else:
-            data["code"] = ""
-            
-        if options.get("include_context", True) and context_files:
-            context_content = self.file_manager.compile_files(context_files)
-            data["context"] = f"//// CONTEXT – START ////\n{context_content}\n//// CONTEXT – END ////"
-        else:
-            data["context"] = ""
-            
-        if options.get("include_reminder", True) and "{reminder}" in template:
-            # Extract reminder from prompt if present
-            reminder_match = re.search(r"######## REMINDER ########\n//// REMINDER – START ////\n(.*?)\n//// REMINDER – END ////", prompt, re.DOTALL)
-            if reminder_match:
-                reminder_content = reminder_match.group(1)
-                data["reminder"] = f"//// REMINDER – START ////\n{reminder_content}\n//// REMINDER – END ////"
-            else:
-                data["reminder"] = ""
-        else:
-            data["reminder"] = ""
-            
-        # Replace variables in template
-        output = template
-        for key, value in data.items():
-            pattern = '{' + key + '}'
-            output = re.sub(pattern, value, output, flags=re.IGNORECASE)
-            
-        return output
+        if template is None:
+            template = self.format_edit.toPlainText()
+        
+        position = 0
+        for match in _PLACEHOLDER_RE.finditer(template):
+            yield template[position:match.start()]
+            position = match.end()
+            yield from self._iter_placeholder(match.group(1).lower(), response, prompt, code_files, context_files, options, template)
+        yield template[position:]
+    
+    def _iter_placeholder(self, key, response, prompt, code_files, context_files, options, template):
+        """Yield the text for one template placeholder."""
+        if key == "prompt":
+            if options.get("include_prompt", True):
+                yield f"//// PROMPT – START ////\n{prompt}\n//// PROMPT – END ////"
+        
+        elif key == "response":
+            if options.get("include_response", True):
+                yield f"//// RESPONSE – START ////\n{response}\n//// RESPONSE – END ////"
+        
+        elif key in ("code", "context"):
+            files = code_files if key == "code" else context_files
+            if options.get(f"include_{key}", True) and files:
+                label = key.upper()
+                yield f"//// {label} – START ////\n"
+                yield from self.file_manager.iter_compiled_files(files)
+                yield f"\n//// {label} – END ////"
+        
+        elif key == "reminder":
+            if options.get("include_reminder", True) and "{reminder}" in template:
+                # Extract reminder from prompt if present
+                reminder_match = _REMINDER_RE.search(prompt)
+                if reminder_match:
+                    yield f"//// REMINDER – START ////\n{reminder_match.group(1)}\n//// REMINDER – END ////"
     
     def _save_response(self):
         """Save the response to a file."""
@@ -8,6 +8,11 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QFont
 
+import re
+
+# Characters not allowed in prompt IDs
+_SAFE_ID_RE = re.compile(r'[^\w\-_]')
+
 class SavePromptDialog(QDialog):
     """Dialog for saving a prompt."""
     
@@ -54,8 +59,7 @@ class SavePromptDialog(QDialog):
         """Update prompt ID based on name."""
         if not self.id_edit.text():
             # Convert name to a valid ID
-            import re
-            prompt_id = re.sub(r'[^\w\-_]', '_', name.lower())
+            prompt_id = _SAFE_ID_RE.sub('_', name.lower())
             self.id_edit.setText(prompt_id)
     
     def get_prompt_name(self):
@@ -188,11 +192,9 @@ class PromptPanel(QWidget):
         # Clear combo box
         self.prompt_combo.clear()
         
-        # Get prompts
-        prompts = self.file_manager.get_prompts()
-        
-        # Add to combo box
-        for prompt_id, prompt_data in sorted(prompts.items(), key=lambda x: x[1].get('name', x[0])):
+        # Add prompts to combo box, sorted by display name
+        prompts = self.file_manager.iter_prompts()
+        for prompt_id, prompt_data in sorted(prompts, key=lambda x: x[1].get('name', x[0])):
             display_name = prompt_data.get('name', prompt_id)
             self.prompt_combo.addItem(display_name, prompt_id)
         
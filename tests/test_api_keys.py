@@ -0,0 +1,90 @@
+# tests/test_api_keys.py
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from core import api_keys
+
+
+class ParseEnvFileTest(unittest.TestCase):
+    
+    def test_parses_entries_and_skips_blank_keys(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            env_path = os.path.join(tmp, ".env")
+            with open(env_path, "w") as f:
+                f.write('# comment\n=oops\n   = blank\nexport A = "quoted" \n  B=b=c\n')
+            self.assertEqual(api_keys.parse_env_file(env_path), {"A": "quoted", "B": "b=c"})
+
+
+class LoadKeysTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.config = {"project_root": self.tmp.name}
+        api_keys._keys_cache = None
+        api_keys._env_file_names.clear()
+    
+    def tearDown(self):
+        api_keys._keys_cache = None
+        api_keys._env_file_names.clear()
+        self.tmp.cleanup()
+    
+    def _write_env(self, text):
+        with open(os.path.join(self.tmp.name, ".env"), "w") as f:
+            f.write(text)
+    
+    def test_empty_key_line_is_skipped(self):
+        self._write_env("=oops\nOPENAI_API_KEY=x\n")
+        with mock.patch.dict(os.environ, {}, clear=True):
+            keys = api_keys.load_keys(self.config)
+        self.assertEqual(keys["openai"], "x")
+    
+    def test_exported_variable_wins_over_env_file(self):
+        self._write_env("OPENAI_API_KEY=from-file\n")
+        with mock.patch.dict(os.environ, {"OPENAI_API_KEY": "from-shell"}, clear=True):
+            self.assertEqual(api_keys.get_key(self.config, "openai"), "from-shell")
+    
+    def test_reload_applies_edited_values(self):
+        self._write_env("OPENAI_API_KEY=old\nGEMINI_API_KEY=g\n")
+        with mock.patch.dict(os.environ, {"ANTHROPIC_API_KEY": "from-shell"}, clear=True):
+            self.assertEqual(api_keys.get_key(self.config, "openai"), "old")
+            
+            self._write_env("OPENAI_API_KEY=new\nANTHROPIC_API_KEY=from-file\n")
+            api_keys._keys_cache = None  # Same-size rewrites can keep the mtime on coarse clocks
+            keys = api_keys.load_keys(self.config)
+        
+        self.assertEqual(keys, {"anthropic": "from-shell", "openai": "new", "gemini": ""})
+
+
+
+@unittest.skipIf(os.name == "nt", "POSIX file modes")
+class SaveKeyTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.config = {"project_root": self.tmp.name}
+        self.env_path = os.path.join(self.tmp.name, ".env")
+    
+    def tearDown(self):
+        api_keys._keys_cache = None
+        self.tmp.cleanup()
+    
+    def test_new_env_file_is_owner_only(self):
+        with mock.patch.dict(os.environ):
+            api_keys.save_key(self.config, "openai", "a")
+        self.assertEqual(os.stat(self.env_path).st_mode & 0o777, 0o600)
+    
+    def test_existing_mode_is_kept(self):
+        with open(self.env_path, "w") as f:
+            f.write("OTHER=1\n")
+        os.chmod(self.env_path, 0o640)
+        with mock.patch.dict(os.environ):
+            api_keys.save_key(self.config, "openai", "b")
+        self.assertEqual(os.stat(self.env_path).st_mode & 0o777, 0o640)
+        with open(self.env_path) as f:
+            self.assertEqual(f.read(), "OTHER=1\nOPENAI_API_KEY=b\n")
+
+
+if __name__ == "__main__":
+    unittest.main()